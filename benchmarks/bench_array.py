@@ -0,0 +1,42 @@
+# Throughput of convert_array versus calling the scalar path in a Python loop.
+#
+#   python -m benchmarks.bench_array
+import time
+
+import numpy as np
+
+from units import convert, convert_array
+
+SIZE = 1_000_000
+CASES = [
+    ("PSI", "Pascal"),
+    ("Fahrenheit", "Celsius"),
+    ("Kilowatt-hour", "Joule"),
+]
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    values = np.random.default_rng(0).uniform(0, 1000, SIZE)
+    as_list = values.tolist()
+    out = np.empty_like(values)
+
+    print(f"{'pair':<28} {'loop Mval/s':>12} {'array Mval/s':>13} {'out= Mval/s':>12}")
+    for from_unit, to_unit in CASES:
+        loop = best_of(lambda: [convert(v, from_unit, to_unit) for v in as_list])
+        array = best_of(lambda: convert_array(values, from_unit, to_unit))
+        in_place = best_of(lambda: convert_array(values, from_unit, to_unit, out=out))
+        pair = f"{from_unit} -> {to_unit}"
+        print(f"{pair:<28} {SIZE / loop / 1e6:>12.2f} {SIZE / array / 1e6:>13.2f} {SIZE / in_place / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
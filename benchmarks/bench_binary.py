@@ -0,0 +1,55 @@
+# Throughput of the block-wise memory-mapped converter against a plain NumPy
+# read / convert / write of the whole file.
+#
+#   python -m benchmarks.bench_binary [size_mb] [block_size]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from convert_binary import DEFAULT_BLOCK_SIZE, convert_binary
+from units import convert_array
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def plain_numpy(src, dst, dtype):
+    values = np.fromfile(src, dtype=dtype)
+    convert_array(values, "PSI", "Pascal", out=values)
+    values.tofile(dst)
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    block_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BLOCK_SIZE
+    dtype = np.dtype("float32")
+    count = size_mb * 1024 * 1024 // dtype.itemsize
+    nbytes = count * dtype.itemsize
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "src.f32")
+        dst = os.path.join(tmp, "dst.f32")
+        np.random.default_rng(0).uniform(0, 100, count).astype(dtype).tofile(src)
+
+        results = [
+            ("plain numpy", timed(lambda: plain_numpy(src, dst, dtype))),
+            ("mmap blocks", timed(lambda: convert_binary(src, dst, "PSI", "Pascal", dtype,
+                                                         block_size=block_size))),
+            ("mmap in place", timed(lambda: convert_binary(src, None, "PSI", "Pascal", dtype,
+                                                           block_size=block_size))),
+        ]
+
+    print(f"{nbytes / 1e9:.2f} GB of {dtype}, block size {block_size:,} values")
+    print(f"{'mode':<14} {'seconds':>8} {'GB/s':>6}")
+    for name, elapsed in results:
+        print(f"{name:<14} {elapsed:>8.2f} {nbytes / elapsed / 1e9:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Cold-start cost of the headless conversion core, measured with
+# `python -X importtime` in fresh interpreters, next to the Streamlit import
+# the app pays on top of it.
+#
+#   python -m benchmarks.bench_import
+import importlib.util
+import subprocess
+import sys
+
+RUNS = 5
+TARGETS = ["units", "converters", "streamlit"]
+
+
+def import_time_us(module):
+    # Cumulative microseconds for `module` as reported by -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("|", ":").split(":"))
+        if name == module:
+            return int(cumulative_us)
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def main():
+    print(f"{'module':<12} {'best ms':>8} {'third-party modules':>20}")
+    for module in TARGETS:
+        if importlib.util.find_spec(module) is None:
+            print(f"{module:<12} {'not installed':>8}")
+            continue
+        import_time_us(module)  # warm the bytecode cache
+        best = min(import_time_us(module) for _ in range(RUNS))
+        loaded = subprocess.run(
+            [sys.executable, "-c",
+             f"import sys; before = set(sys.modules); import {module}; "
+             f"print(len({{m.split('.')[0] for m in set(sys.modules) - before}} - set(sys.stdlib_module_names) - {{'units', 'graph', 'converters'}}))"],
+            capture_output=True, text=True, check=True).stdout.strip()
+        print(f"{module:<12} {best / 1000:>8.2f} {loaded:>20}")
+
+
+if __name__ == "__main__":
+    main()
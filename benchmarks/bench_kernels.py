@@ -0,0 +1,37 @@
+# Per-call cost of the generic converters versus the generated per-pair
+# kernels from kernels.py.
+#
+#   python -m benchmarks.bench_kernels
+import timeit
+
+from converters import power_converter, pressure_converter, temperature_converter
+from kernels import get_converter
+from units import convert
+
+CALLS = 500_000
+
+CASES = [
+    ("power", power_converter, ("Horsepower", "Kilowatt")),
+    ("pressure", pressure_converter, ("PSI", "Pascal")),
+    ("temperature", temperature_converter, ("Celsius", "Fahrenheit")),
+]
+
+
+def per_call_ns(statement):
+    timer = timeit.Timer(statement)
+    return min(timer.repeat(repeat=5, number=CALLS)) / CALLS * 1e9
+
+
+def main():
+    print(f"{'pair':<12} {'converter ns':>13} {'convert ns':>11} {'kernel ns':>10} {'speedup':>8}")
+    for name, converter, (from_unit, to_unit) in CASES:
+        kernel = get_converter(from_unit, to_unit)
+        generic = per_call_ns(lambda: converter(12.5, from_unit, to_unit))
+        registry = per_call_ns(lambda: convert(12.5, from_unit, to_unit))
+        specialised = per_call_ns(lambda: kernel(12.5))
+        print(f"{name:<12} {generic:>13.1f} {registry:>11.1f} {specialised:>10.1f} "
+              f"{generic / specialised:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Throughput of convert_array_parallel from 1 to N worker processes.
+#
+#   python -m benchmarks.bench_parallel [max_workers] [chunk_size]
+import os
+import sys
+import time
+
+import numpy as np
+
+from parallel import DEFAULT_CHUNK_SIZE, convert_array_parallel
+
+SIZE = 50_000_000
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE
+    values = np.random.default_rng(0).uniform(0, 1000, SIZE)
+    out = np.empty_like(values)
+
+    print(f"{SIZE:,} float64 values, chunk size {chunk_size:,}")
+    print(f"{'workers':>7} {'seconds':>8} {'Mval/s':>8} {'scaling':>8}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        convert_array_parallel(values, "Kilowatt-hour", "Joule", workers=workers,
+                               chunk_size=chunk_size, out=out)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>8.3f} {SIZE / elapsed / 1e6:>8.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Per-call cost of the float registry versus the exact Fraction and Decimal
+# modes, to pick a precision mode per workload.
+#
+#   python -m benchmarks.bench_precision
+import timeit
+from decimal import Decimal
+from fractions import Fraction
+
+from exact import convert_exact
+from units import convert
+
+CALLS = 100_000
+CASES = [
+    ("Kilowatt-hour", "Joule"),
+    ("Pound", "Kilogram"),
+    ("Fahrenheit", "Celsius"),
+    ("Gigabyte", "Megabyte"),
+]
+
+
+def per_call_ns(stmt):
+    return min(timeit.Timer(stmt).repeat(repeat=5, number=CALLS)) / CALLS * 1e9
+
+
+def main():
+    value, fraction, decimal = 1234.5, Fraction("1234.5"), Decimal("1234.5")
+    print(f"{'pair':<28} {'float ns':>9} {'fraction ns':>12} {'decimal ns':>11}")
+    for from_unit, to_unit in CASES:
+        as_float = per_call_ns(lambda: convert(value, from_unit, to_unit))
+        as_fraction = per_call_ns(lambda: convert_exact(fraction, from_unit, to_unit))
+        as_decimal = per_call_ns(lambda: convert_exact(decimal, from_unit, to_unit, mode="decimal"))
+        pair = f"{from_unit} -> {to_unit}"
+        print(f"{pair:<28} {as_float:>9.0f} {as_fraction:>12.0f} {as_decimal:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Per-call cost of the precomputed registry versus the previous converters,
+# which rebuilt their factor tables on every call.
+#
+#   python -m benchmarks.bench_registry
+import timeit
+
+from converters import length_converter, pressure_converter, temperature_converter
+
+CALLS = 200_000
+
+
+# Previous implementations, kept here only as the benchmark baseline
+def legacy_length_converter(value, from_unit, to_unit):
+    conversions = {
+        "Meter": {"Kilometer": value / 1000, "Centimeter": value * 100},
+        "Kilometer": {"Meter": value * 1000, "Centimeter": value * 100000},
+        "Centimeter": {"Meter": value / 100, "Kilometer": value / 100000}
+    }
+    return conversions[from_unit][to_unit]
+
+def legacy_temperature_converter(value, from_unit, to_unit):
+    if from_unit == "Celsius":
+        if to_unit == "Fahrenheit":
+            return (value * 9/5) + 32
+        elif to_unit == "Kelvin":
+            return value + 273.15
+    elif from_unit == "Fahrenheit":
+        if to_unit == "Celsius":
+            return (value - 32) * 5/9
+        elif to_unit == "Kelvin":
+            return (value - 32) * 5/9 + 273.15
+    elif from_unit == "Kelvin":
+        if to_unit == "Celsius":
+            return value - 273.15
+        elif to_unit == "Fahrenheit":
+            return (value - 273.15) * 9/5 + 32
+    return value
+
+def legacy_pressure_converter(value, from_unit, to_unit):
+    conversion_factors = {
+        "Pascal": 1,
+        "Bar": 100000,
+        "PSI": 6894.76,
+        "Atmosphere": 101325,
+        "Torr": 133.322
+    }
+    if from_unit not in conversion_factors:
+        return f"Error: '{from_unit}' is not a valid unit."
+    if to_unit not in conversion_factors:
+        return f"Error: '{to_unit}' is not a valid unit."
+    value_in_pascals = value * conversion_factors[from_unit]
+    return value_in_pascals / conversion_factors[to_unit]
+
+
+CASES = [
+    ("length", legacy_length_converter, length_converter, ("Kilometer", "Centimeter")),
+    ("temperature", legacy_temperature_converter, temperature_converter, ("Kelvin", "Fahrenheit")),
+    ("pressure", legacy_pressure_converter, pressure_converter, ("PSI", "Torr")),
+]
+
+
+def per_call_ns(func, from_unit, to_unit):
+    timer = timeit.Timer(lambda: func(12.5, from_unit, to_unit))
+    return min(timer.repeat(repeat=5, number=CALLS)) / CALLS * 1e9
+
+
+def main():
+    print(f"{'converter':<12} {'legacy ns':>10} {'registry ns':>12} {'speedup':>8}")
+    for name, legacy, current, (from_unit, to_unit) in CASES:
+        old = per_call_ns(legacy, from_unit, to_unit)
+        new = per_call_ns(current, from_unit, to_unit)
+        print(f"{name:<12} {old:>10.1f} {new:>12.1f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
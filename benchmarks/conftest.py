@@ -0,0 +1,9 @@
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    # Timing tests skip cleanly without the plugin; accuracy tests still run
+    @pytest.fixture
+    def benchmark():
+        pytest.skip("pytest-benchmark is not installed")
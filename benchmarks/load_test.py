@@ -0,0 +1,101 @@
+# Local load test for service.py: many concurrent keep-alive clients issuing
+# single conversions (which the service coalesces) or batch requests.
+# Reports requests/sec and p50/p99 latency.
+#
+#   python service.py &
+#   python -m benchmarks.load_test --clients 64 --requests 200
+#   python -m benchmarks.load_test --batch 1000
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+PAIRS = [
+    ("PSI", "Pascal"),
+    ("Celsius", "Fahrenheit"),
+    ("Kilowatt-hour", "Joule"),
+    ("Miles per Hour (mph)", "Knots"),
+    ("Gigabyte", "Megabyte"),
+]
+
+
+def _request(host, path, payload):
+    body = json.dumps(payload).encode()
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def client(host, port, requests, batch, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            from_unit, to_unit = random.choice(PAIRS)
+            if batch:
+                message = _request(host, "/convert/batch", {
+                    "from": from_unit, "to": to_unit,
+                    "values": [random.uniform(0, 1000) for _ in range(batch)],
+                })
+            else:
+                message = _request(host, "/convert", {
+                    "value": random.uniform(0, 1000), "from": from_unit, "to": to_unit,
+                })
+            start = time.perf_counter()
+            writer.write(message)
+            await writer.drain()
+            status = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, clients, requests, batch):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, batch, latencies, errors)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(total - 1, int(total * 0.99))] * 1000
+    print(f"{total} requests from {clients} clients in {elapsed:.2f}s, {len(errors)} errors")
+    print(f"{total / elapsed:,.0f} requests/s", end="")
+    if batch:
+        print(f" ({total * batch / elapsed:,.0f} conversions/s)", end="")
+    print(f", p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the conversion service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="values per /convert/batch request (0 = single /convert requests)")
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.clients, args.requests, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1007 @@
+# Benchmark and regression suite for every converter. Timing tests use
+# pytest-benchmark; the accuracy tests alongside them make sure a speedup
+# cannot quietly change results.
+#
+#   python -m pytest benchmarks                       # accuracy + timings
+#   python -m pytest benchmarks --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+#   python -m pytest benchmarks --benchmark-storage=benchmarks/baselines \
+#       --benchmark-compare --benchmark-compare-fail=mean:10%
+import asyncio
+import csv
+import io
+import json
+import math
+import os
+import struct
+import subprocess
+import sys
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+import instrumentation
+import parallel
+from convert_binary import convert_binary
+from convert_file import convert_csv, convert_file, parse_column_spec
+from convert_file import main as convert_file_main
+from converters import CONVERTERS
+from exact import convert_exact
+from expressions import (InvalidExpressionError, compile_unit, convert_expression,
+                         get_expression_factor)
+from formatting import best_unit, best_unit_array, format_best
+from graph import ConversionGraph
+from kernels import get_array_converter, get_converter
+from memo import ConversionCache, memoize
+from parallel import convert_array_parallel
+from quantity import Quantity, QuantityArray
+from rates import MissingRateError, RateStore
+from service import BadRequest, Coalescer, ConversionService, make_handler
+from stream import MAX_LINE, MAX_RECORD, StreamConverter, _StdinReader, convert_batch
+from units import (DIMENSIONS, UNIT_IDS, IncompatibleUnitsError, UnknownUnitError, convert,
+                   convert_array, convert_array_by_ids, get_factor, get_recorder, register_unit,
+                   unit_id)
+
+# Representative non-base pair per dimension
+SAMPLE_PAIRS = {dimension: (units[1], units[2]) for dimension, units in DIMENSIONS.items()}
+
+ALL_PAIRS = [(dimension, from_unit, to_unit)
+             for dimension, units in DIMENSIONS.items()
+             for from_unit in units
+             for to_unit in units]
+
+VALUES = [0.5, 1.0, 123.456, 1e6]
+
+
+# Accuracy
+
+@pytest.mark.parametrize("dimension, from_unit, to_unit", ALL_PAIRS)
+def test_round_trip(dimension, from_unit, to_unit):
+    for value in VALUES:
+        there = convert(value, from_unit, to_unit)
+        back = convert(there, to_unit, from_unit)
+        assert math.isclose(back, value, rel_tol=1e-12, abs_tol=1e-9)
+
+
+@pytest.mark.parametrize("dimension, from_unit, to_unit", ALL_PAIRS)
+def test_float_registry_close_to_exact(dimension, from_unit, to_unit):
+    # The float tables carry rounded constants (e.g. 2.237 mph); they must
+    # stay within 1e-4 of the defined values
+    for value in VALUES:
+        expected = float(convert_exact(value, from_unit, to_unit))
+        assert math.isclose(convert(value, from_unit, to_unit), expected, rel_tol=1e-4, abs_tol=1e-9)
+
+
+@pytest.mark.parametrize("value, from_unit, to_unit, expected", [
+    (1500, "Meter", "Kilometer", 1.5),
+    (1, "Kilogram", "Pound", 2.20462),
+    (100, "Celsius", "Fahrenheit", 212),
+    (32, "Fahrenheit", "Kelvin", 273.15),
+    (1, "Cubic Meter", "Liter", 1000),
+    (36, "Kilometers per Hour (km/h)", "Meters per Second (m/s)", 10),
+    (2, "Hour", "Minute", 120),
+    (1, "Hectare", "Square Meter", 10000),
+    (1, "Atmosphere", "Pascal", 101325),
+    (1, "Kilowatt-hour", "Joule", 3.6e6),
+    (1, "Horsepower", "Watt", 745.7),
+    (1, "Gigabyte", "Megabyte", 1024),
+    (2.5, "Gigahertz", "Megahertz", 2500),
+    (180, "Gradian", "Degree", 162),
+])
+def test_known_values(value, from_unit, to_unit, expected):
+    assert math.isclose(convert(value, from_unit, to_unit), expected, rel_tol=1e-12)
+
+
+@pytest.mark.parametrize("value, from_unit, to_unit, expected", [
+    (32, "Fahrenheit", "Celsius", 0.0),
+    (212, "Fahrenheit", "Celsius", 100.0),
+    (0, "Celsius", "Fahrenheit", 32.0),
+    (100, "Celsius", "Fahrenheit", 212.0),
+    (-40, "Celsius", "Fahrenheit", -40.0),
+    (273.15, "Kelvin", "Celsius", 0.0),
+])
+def test_temperature_landmarks_exact(value, from_unit, to_unit, expected):
+    # Pair factors are folded exactly, so the usual landmarks come out exact
+    assert convert(value, from_unit, to_unit) == expected
+    assert CONVERTERS["Temperature"](value, from_unit, to_unit) == expected
+
+
+def test_core_import_stays_light():
+    # The exact fold must not pull fractions (and decimal, re) into every
+    # cold start
+    code = "import sys, converters; print(sorted({'fractions', 'decimal', 'numpy'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("value, from_text, to_text, expected", [
+    (3, "kWh/day", "W", 125.0),
+    (1, "kg*m/s^2", "J/m", 1.0),
+    (1, "kg·m·s^-2", "J/m", 1.0),
+    (1, "GiB/s", "MB/min", 61440.0),
+    (2, "km/h", "m/s", 2 / 3.6),
+    (1, "m**3", "L", 1000.0),
+    (5, "(m/s)^2", "J/kg", 5.0),
+    (1, "1000*m", "km", 1.0),
+    (32, "°F", "°C", 0.0),
+    (100, "degC", "Fahrenheit", 212.0),
+])
+def test_expressions(value, from_text, to_text, expected):
+    assert math.isclose(convert_expression(value, from_text, to_text), expected, rel_tol=1e-12)
+
+
+def test_expression_plain_units_use_registry():
+    # Affine atoms must not be folded through Kelvin in floats
+    assert convert_expression(32, "°F", "°C") == convert(32, "Fahrenheit", "Celsius") == 0.0
+    assert convert_expression(100, "°C", "°F") == convert(100, "Celsius", "Fahrenheit") == 212.0
+    assert get_expression_factor("psi", "Pa") == get_factor("PSI", "Pascal")
+
+
+def test_expression_plans_are_cached():
+    compile_unit.cache_clear()
+    get_expression_factor.cache_clear()
+    convert_expression(1, "kWh/day", "W")
+    convert_expression(2, "kWh/day", "W")
+    assert get_expression_factor.cache_info().hits == 1
+    assert compile_unit.cache_info().misses == 2
+    assert compile_unit("kWh/day") is compile_unit("kWh/day")
+
+
+def test_expression_errors():
+    with pytest.raises(IncompatibleUnitsError):
+        convert_expression(1, "m/s", "m/s^2")
+    with pytest.raises(IncompatibleUnitsError):
+        convert_expression(1, "°C", "m")
+    with pytest.raises(UnknownUnitError):
+        convert_expression(1, "furlong/fortnight", "m/s")
+    for bad in ["kg*", "m^x", "m^1.5", "(m/s", "m)", "°C/s", "m $"]:
+        with pytest.raises(InvalidExpressionError):
+            compile_unit(bad)
+    # Still a ValueError for callers written before the typed errors
+    assert issubclass(InvalidExpressionError, ValueError)
+
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_converters_match_registry(dimension):
+    converter = CONVERTERS[dimension]
+    for from_unit in DIMENSIONS[dimension]:
+        for to_unit in DIMENSIONS[dimension]:
+            expected = convert(123.456, from_unit, to_unit)
+            if dimension == "Angle":
+                expected = round(expected, 2)
+            assert math.isclose(converter(123.456, from_unit, to_unit), expected, rel_tol=1e-12)
+
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_converters_raise_typed_errors(dimension):
+    converter = CONVERTERS[dimension]
+    unit = DIMENSIONS[dimension][0]
+    with pytest.raises(UnknownUnitError):
+        converter(1.0, "Furlong", unit)
+    other = "Byte" if dimension != "Storage" else "Meter"
+    with pytest.raises(IncompatibleUnitsError):
+        converter(1.0, unit, other)
+
+
+def test_unit_ids_match_names():
+    for from_unit, from_id in UNIT_IDS.items():
+        for to_unit, to_id in UNIT_IDS.items():
+            try:
+                expected = get_factor(from_unit, to_unit)
+            except IncompatibleUnitsError:
+                with pytest.raises(IncompatibleUnitsError):
+                    get_factor(from_id, to_id)
+            else:
+                assert get_factor(from_id, to_id) == expected
+    with pytest.raises(UnknownUnitError):
+        unit_id("Furlong")
+    with pytest.raises(UnknownUnitError):
+        get_factor(len(UNIT_IDS), 0)
+
+
+def test_numpy_integer_ids():
+    np = pytest.importorskip("numpy")
+
+    psi, pascal, meter = (np.int64(unit_id(unit)) for unit in ("PSI", "Pascal", "Meter"))
+    assert get_factor(psi, np.int32(pascal)) == get_factor("PSI", "Pascal")
+    assert convert(2.0, psi, pascal) == convert(2.0, "PSI", "Pascal")
+    with pytest.raises(IncompatibleUnitsError):
+        get_factor(psi, meter)
+
+
+def test_graph_resolves_chains_and_caches():
+    graph = ConversionGraph()
+    graph.add_edge("Foot", "Meter", 0.3048)
+    graph.add_edge("Mile", "Foot", 5280)
+    factor, offset = graph.resolve("Mile", "Meter")
+    assert math.isclose(factor, 1609.344, rel_tol=1e-12) and offset == 0.0
+    assert math.isclose(graph.resolve("Meter", "Mile")[0], 1 / 1609.344, rel_tol=1e-12)
+    assert graph.cache[("Mile", "Meter")] == (factor, offset)
+    # A new edge clears the cache, since it may open a shorter path
+    graph.add_edge("Mile", "Meter", 1609.344)
+    assert graph.cache == {}
+    assert graph.resolve("Mile", "Meter") == (1609.344, 0.0)
+    with pytest.raises(ValueError):
+        graph.add_edge("Inch", "Foot", 0)
+
+
+def test_graph_affine_edges():
+    graph = ConversionGraph()
+    graph.add_edge("Celsius", "Kelvin", 1, 273.15)
+    graph.add_edge("Fahrenheit", "Celsius", 5 / 9, -160 / 9)
+    for value, expected in [(32, 273.15), (212, 373.15), (-40, 233.15)]:
+        factor, offset = graph.resolve("Fahrenheit", "Kelvin")
+        assert math.isclose(value * factor + offset, expected, rel_tol=1e-12)
+        factor, offset = graph.resolve("Kelvin", "Fahrenheit")
+        assert math.isclose(expected * factor + offset, value, rel_tol=1e-12, abs_tol=1e-12)
+
+
+def test_graph_unreachable_pairs():
+    graph = ConversionGraph()
+    graph.add_edge("Foot", "Meter", 0.3048)
+    graph.add_edge("Psi", "Pascal", 6894.76)
+    for pair in [("Foot", "Pascal"), ("Foot", "Furlong"), ("Furlong", "Foot")]:
+        with pytest.raises(KeyError):
+            graph.resolve(*pair)
+
+
+def test_register_unit_chains_through_registered_units():
+    register_unit("Test Foot", "Meter", 0.3048)
+    register_unit("Test Mile", "Test Foot", 5280)
+    assert math.isclose(convert(1, "Test Mile", "Kilometer"), 1.609344, rel_tol=1e-12)
+    assert math.isclose(convert(1609.344, "Meter", "Test Mile"), 1.0, rel_tol=1e-12)
+    register_unit("Test Rankine", "Kelvin", 5 / 9)
+    assert math.isclose(convert(491.67, "Test Rankine", "Celsius"), 0.0, abs_tol=1e-9)
+    with pytest.raises(IncompatibleUnitsError):
+        convert(1, "Test Mile", "Pascal")
+    with pytest.raises(UnknownUnitError):
+        convert(1, "Test Mile", "Test Furlong")
+    with pytest.raises(UnknownUnitError):
+        register_unit("Test Furlong", "Test Chain", 10)
+    with pytest.raises(ValueError):
+        register_unit("Meter", "Kilometer", 0.001)
+
+
+@pytest.mark.parametrize("dimension", list(DIMENSIONS))
+def test_convert_array_matches_scalar(dimension):
+    np = pytest.importorskip("numpy")
+
+    values = np.array(VALUES)
+    for from_unit in DIMENSIONS[dimension]:
+        for to_unit in DIMENSIONS[dimension]:
+            expected = [convert(value, from_unit, to_unit) for value in VALUES]
+            np.testing.assert_allclose(convert_array(values, from_unit, to_unit), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("value", [5.0, 5, "0-d", "0-d float32"])
+def test_array_paths_accept_scalars(value):
+    # Affine pairs used to fail on scalar input in np.add(..., out=)
+    np = pytest.importorskip("numpy")
+
+    if value == "0-d":
+        value = np.array(5.0)
+    elif value == "0-d float32":
+        value = np.array(5.0, dtype=np.float32)
+    celsius, kelvin = unit_id("Celsius"), unit_id("Kelvin")
+    for result in (convert_array(value, "Celsius", "Kelvin"),
+                   convert_array_by_ids(value, celsius, kelvin),
+                   get_array_converter("Celsius", "Kelvin")(value)):
+        assert np.ndim(result) == 0
+        assert math.isclose(float(result), 278.15, rel_tol=1e-6)
+    assert convert_array(value, "Celsius", "Kelvin").dtype == np.asarray(value * 1.0).dtype
+
+
+class _Calls:
+    # A converter that records its calls and returns the value's sign
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, value, from_unit, to_unit):
+        self.calls.append(value)
+        if from_unit == "Furlong":
+            raise UnknownUnitError(from_unit)
+        return math.copysign(1.0, value)
+
+
+def test_memo_nan_and_signed_zero_keys():
+    func = _Calls()
+    cached = ConversionCache(func)
+    assert cached(math.nan, "Celsius", "Kelvin") == 1.0
+    cached(float("nan"), "Celsius", "Kelvin")
+    assert len(func.calls) == 1  # every NaN shares one entry
+    assert cached(0.0, "Celsius", "Kelvin") == 1.0
+    assert cached(-0.0, "Celsius", "Kelvin") == -1.0  # not the cached 0.0 result
+    assert cached(-0.0, "Celsius", "Kelvin") == -1.0
+    assert len(func.calls) == 3
+    assert cached.stats()[:4] == (2, 3, 0, 3)
+
+
+@pytest.mark.parametrize("policy, kept", [("lru", {1.0, 3.0}), ("fifo", {2.0, 3.0})])
+def test_memo_eviction_policy(policy, kept):
+    func = _Calls()
+    cached = ConversionCache(func, maxsize=2, policy=policy)
+    for value in (1.0, 2.0, 1.0, 3.0):
+        cached(value, "Meter", "Kilometer")
+    assert {key[0] for key in cached.entries} == kept
+    stats = cached.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size, stats.maxsize) == (1, 3, 1, 2, 2)
+    assert stats.hit_rate == 0.25
+
+
+def test_memo_stats_errors_and_clear():
+    func = _Calls()
+    cached = memoize(maxsize=8)(func)
+    assert cached.stats().hit_rate == 0.0
+    for _ in range(2):
+        with pytest.raises(UnknownUnitError):
+            cached(1.0, "Furlong", "Meter")
+    assert len(func.calls) == 2  # failures are not stored
+    assert cached.stats()[:4] == (0, 2, 0, 0)
+    cached(1.0, "Meter", "Kilometer")
+    cached(1.0, "Meter", "Kilometer")
+    assert cached.stats().hits == 1
+    cached.clear()
+    assert cached.stats()[:4] == (0, 0, 0, 0)
+    for bad in [dict(maxsize=0), dict(policy="random")]:
+        with pytest.raises(ValueError):
+            ConversionCache(func, **bad)
+
+
+@pytest.fixture
+def shared_blocks(monkeypatch):
+    # Names of the shared-memory blocks convert_array_parallel creates
+    from multiprocessing import shared_memory
+
+    created = []
+    original = shared_memory.SharedMemory
+
+    def tracking(*args, **kwargs):
+        block = original(*args, **kwargs)
+        if kwargs.get("create"):
+            created.append(block.name)
+        return block
+
+    monkeypatch.setattr(parallel.shared_memory, "SharedMemory", tracking)
+    yield created
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            original(name=name)  # unlinked
+
+
+@pytest.mark.parametrize("shape, dtype, from_unit, to_unit", [
+    ((1000,), "float64", "PSI", "Pascal"),
+    ((25, 40), "float32", "Celsius", "Fahrenheit"),
+    ((10, 10, 10), "int64", "Kilowatt-hour", "Joule"),
+])
+def test_convert_array_parallel_matches_convert_array(shared_blocks, shape, dtype, from_unit, to_unit):
+    np = pytest.importorskip("numpy")
+
+    values = np.arange(np.prod(shape)).reshape(shape).astype(dtype)
+    expected = convert_array(values, from_unit, to_unit)
+    result = convert_array_parallel(values, from_unit, to_unit, workers=2, chunk_size=97)
+    assert result.shape == shape and result.dtype == expected.dtype
+    np.testing.assert_array_equal(result, expected)
+    out = np.empty(shape, dtype=expected.dtype)
+    assert convert_array_parallel(values, from_unit, to_unit, workers=2, chunk_size=97, out=out) is out
+    np.testing.assert_array_equal(out, expected)
+    assert len(shared_blocks) == 4
+
+
+def test_convert_array_parallel_cleans_up_on_error(shared_blocks):
+    np = pytest.importorskip("numpy")
+
+    with pytest.raises(ValueError):
+        convert_array_parallel(np.ones(1000), "PSI", "Pascal", workers=2, chunk_size=97,
+                               out=np.empty(999))
+    assert len(shared_blocks) == 2
+    with pytest.raises(IncompatibleUnitsError):
+        convert_array_parallel(np.ones(1000), "PSI", "Meter", workers=2, chunk_size=97)
+    assert len(shared_blocks) == 2  # rejected before any block was made
+
+
+@pytest.mark.parametrize("dimension, from_unit, to_unit", ALL_PAIRS)
+def test_kernels_match_registry(dimension, from_unit, to_unit):
+    kernel = get_converter(from_unit, to_unit)
+    assert get_converter(from_unit, to_unit) is kernel
+    for value in VALUES:
+        assert kernel(value) == convert(value, from_unit, to_unit)
+
+
+def test_kernels_accept_numpy_scalar_factors():
+    np = pytest.importorskip("numpy")
+
+    register_unit("Kernel Test Span", "Meter", np.float64(2.0), np.float64(0.5))
+    kernel = get_converter("Kernel Test Span", "Meter")
+    assert "np." not in kernel.__source__
+    assert kernel(3.0) == 6.5
+    assert get_array_converter("Kernel Test Span", "Meter")(np.array([3.0])).tolist() == [6.5]
+
+
+def test_kernels_raise_typed_errors():
+    with pytest.raises(UnknownUnitError):
+        get_converter("Furlong", "Meter")
+    with pytest.raises(IncompatibleUnitsError):
+        get_converter("PSI", "Meter")
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+def test_array_kernels_match_convert_array(backend):
+    np = pytest.importorskip("numpy")
+    if backend == "numba":
+        pytest.importorskip("numba")
+
+    values = np.array(VALUES)
+    for dimension, from_unit, to_unit in ALL_PAIRS:
+        kernel = get_array_converter(from_unit, to_unit, backend)
+        np.testing.assert_allclose(kernel(values), convert_array(values, from_unit, to_unit), rtol=1e-15)
+
+
+@pytest.mark.parametrize("value", [3, "1.5", 1.5, Fraction(3, 2), Decimal("1.5")])
+def test_exact_decimal_accepts_all_inputs(value):
+    expected = Decimal(str(float(Fraction(value)))) * 3600000
+    assert convert_exact(value, "Kilowatt-hour", "Joule", mode="decimal") == expected
+    assert convert_exact(value, "Kilowatt-hour", "Joule") == Fraction(value) * 3600000
+
+
+def test_quantity_array_to_and_views():
+    np = pytest.importorskip("numpy")
+
+    readings = QuantityArray([14.7, 29.4, 44.1], "PSI")
+    assert readings.to("PSI") is readings
+    in_pascal = readings.to("Pascal")
+    np.testing.assert_allclose(in_pascal.values, convert_array(readings.values, "PSI", "Pascal"))
+    assert readings[0] == Quantity(14.7, "PSI")
+    view = readings[1:]
+    strided = readings[::2]
+    assert np.shares_memory(view.values, readings.values)
+    assert np.shares_memory(strided.values, readings.values) and strided.values.tolist() == [14.7, 44.1]
+    assert readings.to("Bar", out=readings.values) is readings  # in place, retagged
+    assert readings.unit == "Bar" and math.isclose(view[0].value, 29.4 * 6894.76 / 1e5)
+    assert math.isclose(readings.to("PSI")[0].value, 14.7)
+    with pytest.raises(ValueError):
+        readings.to("Pascal", out=readings.values[::2])
+    narrow = QuantityArray([1.0, 2.0], "Bar").to("Pascal", out=np.empty(2, dtype=np.float32))
+    assert narrow.dtype == np.float32 and narrow.values.tolist() == [1e5, 2e5]
+
+
+def test_quantity_array_numpy_copy_semantics():
+    np = pytest.importorskip("numpy")
+
+    readings = QuantityArray([1.0, 2.0], "PSI")
+    assert np.asarray(readings) is readings.values
+    copied = np.array(readings)
+    copied[0] = 99.0
+    assert readings.values[0] == 1.0
+    with pytest.raises(ValueError):
+        np.asarray(readings, dtype=np.float32, copy=False)
+    # .buffer works before Python 3.12, where memoryview(readings) does not
+    buffer = readings.buffer
+    assert buffer.format == "d" and buffer.tolist() == [1.0, 2.0]
+    buffer[1] = 5.0
+    assert readings.values[1] == 5.0
+    if sys.version_info >= (3, 12):
+        assert memoryview(readings).tolist() == [1.0, 5.0]
+
+
+def test_quantity_array_save_load_mmap(tmp_path):
+    np = pytest.importorskip("numpy")
+
+    path = str(tmp_path / "pressure.npy")
+    QuantityArray([1.0, 2.0, 3.0], "Bar", dtype="float32").save(path)
+    mapped = QuantityArray.load(path, mmap_mode="r")
+    assert mapped.unit == "Bar" and mapped.dtype == np.float32
+    assert not mapped.values.flags.owndata and mapped.values.tolist() == [1.0, 2.0, 3.0]
+    # Converting a r+ mapping in place writes through to the file
+    writable = QuantityArray.load(path, mmap_mode="r+")
+    assert writable.to("Pascal", out=writable.values).unit == "Pascal"
+    del writable
+    assert QuantityArray.load(path, unit="Pascal").values.tolist() == [1e5, 2e5, 3e5]
+
+
+def test_quantity_array_from_quantities():
+    pytest.importorskip("numpy")
+
+    mixed = QuantityArray.from_quantities([Quantity(1, "Kilometer"), (250, "Centimeter"), (3, "Meter")],
+                                          "Meter")
+    assert mixed.unit == "Meter" and mixed.values.tolist() == [1000.0, 2.5, 3.0]
+    with pytest.raises(UnknownUnitError):
+        QuantityArray.from_quantities([(1, "Furlong")], "Meter")
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="") as handle:
+        csv.writer(handle).writerows(rows)
+
+
+def _read_csv(path):
+    with open(path, newline="") as handle:
+        return list(csv.reader(handle))
+
+
+def test_parse_column_spec():
+    assert parse_column_spec("pressure:PSI -> Pascal") == ("pressure", "PSI", "Pascal")
+    assert parse_column_spec("flow:Gallon (US)->Liter") == ("flow", "Gallon (US)", "Liter")
+    for bad in ["pressure", "pressure:PSI", ":PSI->Pascal", "pressure:PSI->Meter", "pressure:Furlong->Meter"]:
+        with pytest.raises(ValueError):
+            parse_column_spec(bad)
+
+
+def test_convert_csv_coerces_bad_cells(tmp_path):
+    pytest.importorskip("numpy")
+
+    src, dst = tmp_path / "in.csv", tmp_path / "out.csv"
+    _write_csv(src, [["id", "pressure", "note"], ["1", "1", "a"], ["2", "", "b"], ["3", "n/a", "c"],
+                     ["4"], ["5", "2", "x", "extra"]])
+    assert convert_csv(str(src), str(dst), [("pressure", "PSI", "Pascal")]) == 5
+    assert _read_csv(dst) == [["id", "pressure", "note"], ["1", "6894.76", "a"], ["2", "", "b"],
+                              ["3", "", "c"], ["4", ""], ["5", "13789.52", "x", "extra"]]
+    with pytest.raises(ValueError, match="Column not found"):
+        convert_csv(str(src), str(dst), [("temperature", "Celsius", "Kelvin")])
+    (tmp_path / "empty.csv").write_text("")
+    with pytest.raises(ValueError, match="empty"):
+        convert_csv(str(tmp_path / "empty.csv"), str(dst), [("pressure", "PSI", "Pascal")])
+    assert convert_file_main([str(src), str(dst), "--col", "temperature:Celsius->Kelvin"]) == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_csv_chunks_keep_order(tmp_path, workers):
+    pytest.importorskip("numpy")
+
+    src, dst = tmp_path / "in.csv", tmp_path / "out.csv"
+    _write_csv(src, [["id", "temp", "energy"]] + [[str(i), str(i / 4), str(i)] for i in range(1000)])
+    specs = [("temp", "Celsius", "Fahrenheit"), ("energy", "Kilowatt-hour", "Joule")]
+    assert convert_csv(str(src), str(dst), specs, chunk_size=37, workers=workers) == 1000
+    rows = _read_csv(dst)
+    assert [row[0] for row in rows[1:]] == [str(i) for i in range(1000)]
+    assert rows[1:] == [[str(i), repr(convert(i / 4, "Celsius", "Fahrenheit")),
+                         repr(convert(float(i), "Kilowatt-hour", "Joule"))] for i in range(1000)]
+
+
+def test_convert_parquet_chunks_keep_order(tmp_path):
+    np = pytest.importorskip("numpy")
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    src, dst = str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet")
+    values = np.arange(1000, dtype=np.float64)
+    pq.write_table(pa.table({"id": np.arange(1000), "pressure": values}), src)
+    assert convert_file(src, dst, [("pressure", "PSI", "Pascal")], chunk_size=37, workers=2) == 1000
+    table = pq.read_table(dst)
+    assert table.column("id").to_pylist() == list(range(1000))
+    np.testing.assert_array_equal(table.column("pressure").to_numpy(), convert_array(values, "PSI", "Pascal"))
+    with pytest.raises(ValueError):
+        convert_file(src, str(tmp_path / "out.csv"), [("pressure", "PSI", "Pascal")])
+
+
+@pytest.mark.parametrize("dtype, out_dtype, in_place", [
+    ("float64", None, False),
+    ("float32", None, True),
+    (">f4", None, False),
+    (">f4", None, True),
+    ("float32", "float64", False),
+])
+@pytest.mark.parametrize("block_size", [1, 7, 1000, 5000])
+def test_convert_binary_round_trip(tmp_path, dtype, out_dtype, in_place, block_size):
+    np = pytest.importorskip("numpy")
+
+    values = np.random.default_rng(0).uniform(0, 100, 1003).astype(dtype)
+    src = tmp_path / "src.bin"
+    values.tofile(src)
+    dst = None if in_place else tmp_path / "dst.bin"
+    count = convert_binary(str(src), dst and str(dst), "PSI", "Pascal", dtype, out_dtype, block_size)
+    assert count == len(values)
+    converted = np.fromfile(src if in_place else dst, dtype=out_dtype or dtype)
+    expected = convert_array(values.astype(out_dtype or dtype), "PSI", "Pascal")
+    np.testing.assert_array_equal(converted, expected.astype(out_dtype or dtype))
+    if not in_place:
+        np.testing.assert_array_equal(np.fromfile(src, dtype=dtype), values)
+
+
+def test_convert_binary_errors(tmp_path):
+    np = pytest.importorskip("numpy")
+
+    src = tmp_path / "src.bin"
+    np.ones(3, dtype="float32").tofile(src)
+    with pytest.raises(IncompatibleUnitsError):
+        convert_binary(str(src), None, "PSI", "Meter", "float32")
+    with pytest.raises(ValueError):
+        convert_binary(str(src), None, "PSI", "Pascal", "float32", out_dtype="float64")
+    with pytest.raises(ValueError):
+        convert_binary(str(src), None, "PSI", "Pascal", "float64", block_size=2)  # 12 bytes
+
+
+@pytest.mark.parametrize("link", [os.symlink, os.link])
+def test_convert_binary_linked_dst_is_in_place(tmp_path, link):
+    # A link to src must not be truncated as a separate output first
+    np = pytest.importorskip("numpy")
+
+    src = tmp_path / "src.bin"
+    np.array([1.0, 2.0]).tofile(src)
+    alias = tmp_path / "alias.bin"
+    link(src, alias)
+    assert convert_binary(str(src), str(alias), "Bar", "Pascal") == 2
+    assert np.fromfile(src).tolist() == [1e5, 2e5]
+    with pytest.raises(ValueError):
+        convert_binary(str(src), str(alias), "Bar", "Pascal", out_dtype="float32")
+    assert np.fromfile(src).tolist() == [1e5, 2e5]
+
+
+@pytest.mark.parametrize("value, unit, expected", [
+    (1572864, "Byte", "1.50 Megabyte"),
+    (1023, "Byte", "1023.00 Byte"),
+    (100000, "Centimeter", "1.00 Kilometer"),
+    (4.2e7, "Joule", "11.67 Kilowatt-hour"),
+    (3.2e-19, "Joule", "2.00 Electronvolt"),
+    (0, "Gigabyte", "0.00 Byte"),
+    (90, "Minute", "1.50 Hour"),
+    (-2500, "Watt", "-2.50 Kilowatt"),
+    (25, "Celsius", "25.00 Celsius"),
+])
+def test_format_best(value, unit, expected):
+    assert format_best(value, unit) == expected
+
+
+@pytest.mark.parametrize("dimension", list(DIMENSIONS))
+def test_best_unit_array_matches_scalar(dimension):
+    np = pytest.importorskip("numpy")
+
+    values = np.array([0.0, -3e-7] + VALUES + [5e12, float("inf")])
+    for unit in DIMENSIONS[dimension]:
+        scaled, units = best_unit_array(values, unit)
+        expected = [best_unit(value, unit) for value in values.tolist()]
+        assert units.tolist() == [scaled_unit for _, scaled_unit in expected]
+        np.testing.assert_allclose(scaled, [value for value, _ in expected], rtol=1e-12)
+
+
+RATES_CSV = """timestamp,series,rate
+2024-01-01T00:00:00Z,USD/Kilowatt-hour,0.12
+2024-02-01T00:00:00Z,USD/Kilowatt-hour,0.15
+2024-01-01T00:00:00Z,EUR/USD,0.9
+2024-01-01T00:00:00Z,USD/Gigabyte,0.02
+"""
+
+
+@pytest.fixture
+def rate_store(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text(RATES_CSV)
+    return RateStore.load(str(path))
+
+
+@pytest.mark.parametrize("value, from_unit, to_unit, at, expected", [
+    (100, "Kilowatt-hour", "USD", "2024-01-15", 12.0),
+    (100, "Kilowatt-hour", "USD", "2024-02-01T00:00:00Z", 15.0),
+    (100, "Kilowatt-hour", "EUR", "2024-03-01", 13.5),
+    (13.5, "EUR", "Kilowatt-hour", "2024-03-01", 100.0),
+    (1024, "Megabyte", "USD", "2024-03-01", 0.02),
+    (0.15, "USD/Kilowatt-hour", "EUR/Watt-hour", "2024-03-01", 0.000135),
+    (9, "EUR", "USD", "2024-03-01", 10.0),
+])
+def test_rate_conversions(rate_store, value, from_unit, to_unit, at, expected):
+    assert math.isclose(rate_store.convert(value, from_unit, to_unit, at), expected, rel_tol=1e-12)
+
+
+def test_rate_errors(rate_store):
+    with pytest.raises(MissingRateError):
+        rate_store.convert(1, "Kilowatt-hour", "USD", "2023-12-31")
+    with pytest.raises(UnknownUnitError):
+        rate_store.convert(1, "Kilowatt-hour", "GBP", "2024-03-01")
+    with pytest.raises(IncompatibleUnitsError):
+        rate_store.convert(1, "USD/Kilowatt-hour", "USD/Gigabyte", "2024-03-01")
+
+
+@pytest.mark.parametrize("gbp, eur", [("GBP/USD", "EUR/USD"), ("USD/GBP", "USD/EUR")])
+def test_rate_cross_currency(gbp, eur):
+    # GBP -> EUR with only USD quotes goes through USD, as of one time
+    store = RateStore()
+    for series, old, new in [(gbp, 0.8, 0.75), (eur, 0.9, 0.95)]:
+        inverse = series.startswith("USD")
+        store.add(series, "2024-01-01", 1 / old if inverse else old)
+        store.add(series, "2024-02-01", 1 / new if inverse else new)
+    assert math.isclose(store.convert(8, "GBP", "EUR", "2024-01-15"), 9.0, rel_tol=1e-12)
+    assert math.isclose(store.convert(7.5, "GBP", "EUR", "2024-02-15"), 9.5, rel_tol=1e-12)
+    assert math.isclose(store.convert(9, "EUR", "GBP", "2024-01-15"), 8.0, rel_tol=1e-12)
+    store.add("JPY/CHF", "2024-01-01", 170)
+    with pytest.raises(MissingRateError):
+        store.convert(1, "GBP", "JPY", "2024-01-15")
+
+
+def test_rate_numpy_timestamps(rate_store):
+    np = pytest.importorskip("numpy")
+
+    at = 1706745600  # 2024-02-01T00:00:00Z
+    expected = rate_store.convert(100, "Kilowatt-hour", "USD", at)
+    assert rate_store.convert(100, "Kilowatt-hour", "USD", np.int64(at)) == expected == 15.0
+    assert rate_store.convert(100, "Kilowatt-hour", "USD", np.float32(at)) == expected
+    assert rate_store.convert_array(100.0, np.int64(at), "Kilowatt-hour", "USD") == expected
+    with pytest.raises(TypeError):
+        rate_store.convert(100, "Kilowatt-hour", "USD", object())
+
+
+def test_rate_store_sqlite_round_trip(rate_store, tmp_path):
+    path = str(tmp_path / "rates.db")
+    rate_store.write_sqlite(path)
+    loaded = RateStore.load(path)
+    for at in ("2024-01-15", "2024-02-15"):
+        assert loaded.convert(100, "Kilowatt-hour", "EUR", at) == rate_store.convert(100, "Kilowatt-hour", "EUR", at)
+
+
+def test_rate_convert_array_matches_scalar(rate_store):
+    np = pytest.importorskip("numpy")
+
+    timestamps = np.array(["2024-03-01", "2024-01-01", "2024-01-31T23:59:59", "2024-02-01"],
+                          dtype="datetime64[s]")
+    values = np.array([1.0, 10.0, 100.0, 1000.0])
+    expected = [rate_store.convert(value, "Kilowatt-hour", "EUR", at)
+                for value, at in zip(values.tolist(), timestamps.tolist())]
+    np.testing.assert_allclose(rate_store.convert_array(values, timestamps, "Kilowatt-hour", "EUR"),
+                               expected, rtol=1e-12)
+    with pytest.raises(MissingRateError):
+        rate_store.convert_array(values, np.zeros(4), "Kilowatt-hour", "EUR")
+
+
+def _post(path, payload):
+    body = json.dumps(payload).encode()
+    return (f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n").encode() + body
+
+
+async def _exchange(port, request):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+@pytest.mark.filterwarnings("ignore:overflow encountered")
+def test_service_isolates_bad_values():
+    pytest.importorskip("numpy")
+
+    async def scenario():
+        service = ConversionService(Coalescer(window=0.01))
+        server = await asyncio.start_server(make_handler(service), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(*(
+                _exchange(port, _post("/convert", {"value": value, "from": "PSI", "to": "Pascal"}))
+                for value in (1, 10**400, 2, 1e308)))
+
+    ok_one, huge, ok_two, overflow = asyncio.run(scenario())
+    assert ok_one == (200, {"value": 6894.76, "unit": "Pascal"})
+    assert ok_two == (200, {"value": 2 * 6894.76, "unit": "Pascal"})
+    assert huge[0] == overflow[0] == 400
+
+
+@pytest.mark.filterwarnings("ignore:overflow encountered")
+def test_service_batch_rejects_out_of_range():
+    pytest.importorskip("numpy")
+
+    service = ConversionService(Coalescer())
+    with pytest.raises(BadRequest):
+        service.convert_batch({"from": "PSI", "to": "Pascal", "values": [1, 10**400]})
+    with pytest.raises(BadRequest):
+        service.convert_batch({"conversions": [{"value": 1e308, "from": "PSI", "to": "Pascal"}]})
+
+
+class _Sink:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def _run_stream(data, binary=False, reader=None):
+    async def scenario():
+        source = reader
+        if source is None:
+            source = asyncio.StreamReader(limit=MAX_LINE)
+            source.feed_data(data)
+            source.feed_eof()
+        sink = _Sink()
+        converter = StreamConverter({"Pressure": "Pascal"}, latency=0, binary=binary)
+        count = await asyncio.wait_for(converter.run(source, sink), timeout=5)
+        return count, bytes(sink.data)
+
+    return asyncio.run(scenario())
+
+
+def _binary_record(value, spec):
+    body = struct.pack(">d", value) + spec.encode()
+    return struct.pack(">I", len(body)) + body
+
+
+def _binary_replies(data):
+    replies = []
+    while data:
+        (length,) = struct.unpack_from(">I", data)
+        body, data = data[4:4 + length], data[4 + length:]
+        if body[0] == 0:
+            replies.append((struct.unpack(">d", body[1:9])[0], body[9:].decode()))
+        else:
+            replies.append(("error", body[1:].decode()))
+    return replies
+
+
+def test_stream_text_records():
+    count, output = _run_stream(b"1 PSI\n\n2 Bar -> Kilopascal\nabc PSI\n1 Meter\n5 Furlong\n100 Celsius -> Fahrenheit\n")
+    assert count == 6
+    assert output.decode().splitlines() == [
+        "6894.76 Pascal",
+        "error: Unknown unit 'Kilopascal'",
+        "error: Invalid value 'abc'",
+        "error: No target unit for 'Meter'",
+        "error: Unknown unit 'Furlong'",
+        "212.0 Fahrenheit",
+    ]
+
+
+@pytest.mark.parametrize("length", [MAX_LINE + 10, 5 * MAX_LINE])
+def test_stream_oversized_line_is_skipped(length):
+    # One error reply for the long line, then the stream carries on
+    count, output = _run_stream(b"1 PSI\n" + b"9" * length + b" PSI\n2 PSI\n3 PSI")
+    assert output.decode().splitlines() == [
+        "6894.76 Pascal", f"error: Line longer than {MAX_LINE} bytes", "13789.52 Pascal",
+        "20684.28 Pascal"]
+
+
+def test_stream_stdin_reader_caps_lines():
+    data = b"1 PSI\n" + b"9" * (3 * MAX_LINE) + b"\n2 PSI\n" + b"9" * (3 * MAX_LINE)
+    reader = _StdinReader(io.BytesIO(data), chunk_size=4096)
+    count, output = _run_stream(None, reader=reader)
+    error = f"error: Line longer than {MAX_LINE} bytes"
+    assert output.decode().splitlines() == ["6894.76 Pascal", error, "13789.52 Pascal", error]
+    assert len(reader.buffer) == 0
+
+
+def test_stream_binary_records():
+    data = (_binary_record(1.0, "PSI") + _binary_record(2.0, "Kilowatt-hour->Joule")
+            + _binary_record(3.0, "PSI->Meter"))
+    count, output = _run_stream(data, binary=True)
+    assert count == 3
+    assert _binary_replies(output) == [(6894.76, "Pascal"), (7200000.0, "Joule"),
+                                       ("error", "Cannot convert 'PSI' to 'Meter'")]
+
+
+@pytest.mark.parametrize("tail, message", [
+    (b"\x00\x00", "Truncated record length"),
+    (struct.pack(">I", 20) + b"\x00" * 5, "Truncated record"),
+    (struct.pack(">I", MAX_RECORD + 1), f"Record length {MAX_RECORD + 1} out of range"),
+    (struct.pack(">I", 2) + b"ab", "Record length 2 out of range"),
+])
+def test_stream_binary_framing_errors(tail, message):
+    count, output = _run_stream(_binary_record(1.0, "PSI") + tail, binary=True)
+    assert _binary_replies(output) == [(6894.76, "Pascal"), ("error", message)]
+
+
+@pytest.fixture
+def recorder():
+    recorder = instrumentation.enable()
+    yield recorder
+    instrumentation.disable()
+
+
+def test_instrumentation_swaps_and_restores_converters():
+    import converters
+
+    original = converters.pressure_converter
+    recorder = instrumentation.enable()
+    try:
+        assert converters.pressure_converter is not original
+        assert converters.CONVERTERS["Pressure"].__wrapped__ is original
+        assert converters.pressure_converter(1, "Bar", "Pascal") == original(1, "Bar", "Pascal")
+        with pytest.raises(UnknownUnitError):
+            converters.pressure_converter(1, "Bar", "Furlong")
+    finally:
+        instrumentation.disable()
+    assert converters.pressure_converter is original
+    assert converters.CONVERTERS["Pressure"] is original
+    assert get_recorder() is None
+    (row,) = [row for row in recorder.snapshot() if row["to"] == "Pascal"]
+    assert (row["dimension"], row["from"], row["count"], row["errors"]) == ("Pressure", "Bar", 1, 0)
+    assert sum(row["errors"] for row in recorder.snapshot()) == 1
+
+
+def test_instrumentation_prometheus_output(recorder):
+    recorder.record("Pressure", "PSI", "Pascal", 3e-6, calls=2)
+    recorder.record("Pressure", "PSI", "Pascal", 1.0, error=True)
+    text = recorder.to_prometheus()
+    labels = 'dimension="Pressure",from="PSI",to="Pascal"'
+    assert f"unit_conversions_total{{{labels}}} 3" in text
+    assert f"unit_conversion_errors_total{{{labels}}} 1" in text
+    assert f'unit_conversion_seconds_bucket{{{labels},le="1e-06"}} 0' in text
+    assert f'unit_conversion_seconds_bucket{{{labels},le="5e-06"}} 2' in text
+    assert f'unit_conversion_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"unit_conversion_seconds_count{{{labels}}} 3" in text
+    assert json.loads(recorder.to_json())["conversions"][0]["count"] == 3
+
+
+def test_instrumentation_records_batch_paths(recorder):
+    np = pytest.importorskip("numpy")
+
+    convert(1.0, "Meter", "Kilometer")
+    convert_array(np.ones(1000), "PSI", "Pascal")
+    with pytest.raises(IncompatibleUnitsError):
+        convert_array([1.0, 2.0], "PSI", "Meter")
+    rows = {(row["from"], row["to"]): row for row in recorder.snapshot()}
+    assert rows[("Meter", "Kilometer")]["count"] == 1
+    assert rows[("PSI", "Pascal")]["count"] == 1000
+    assert (rows[("PSI", "Meter")]["count"], rows[("PSI", "Meter")]["errors"]) == (2, 2)
+    instrumentation.disable()
+    convert_array(np.ones(10), "PSI", "Pascal")
+    assert recorder.snapshot() == list(rows.values())
+
+
+def test_instrumentation_records_stream_batches(recorder):
+    replies = convert_batch([(1.0, "PSI", "Pascal"), (2.0, "PSI", "Pascal"), (1.0, "PSI", "Meter")])
+    assert [error is None for _, _, error in replies] == [True, True, False]
+    rows = {(row["from"], row["to"]): row for row in recorder.snapshot()}
+    assert (rows[("PSI", "Pascal")]["count"], rows[("PSI", "Pascal")]["errors"]) == (2, 0)
+    assert (rows[("PSI", "Meter")]["count"], rows[("PSI", "Meter")]["errors"]) == (1, 1)
+
+
+def test_instrumentation_labels_unit_ids(recorder):
+    psi, pascal = unit_id("PSI"), unit_id("Pascal")
+    convert(1.0, psi, pascal)
+    convert(2.0, "PSI", "Pascal")
+    with pytest.raises(UnknownUnitError):
+        convert(1.0, len(UNIT_IDS), pascal)
+    with pytest.raises(UnknownUnitError):
+        convert(1.0, "Furlong", "Meter")
+    rows = {(row["dimension"], row["from"], row["to"]): row for row in recorder.snapshot()}
+    assert rows[("Pressure", "PSI", "Pascal")]["count"] == 2
+    assert rows[("unknown", str(len(UNIT_IDS)), "Pascal")]["errors"] == 1
+    assert 'dimension="Pressure",from="PSI",to="Pascal"' in recorder.to_prometheus()
+    assert len(json.loads(recorder.to_json())["conversions"]) == 3
+
+
+# Timings
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_bench_scalar(benchmark, dimension):
+    from_unit, to_unit = SAMPLE_PAIRS[dimension]
+    benchmark.group = "scalar"
+    benchmark(CONVERTERS[dimension], 123.456, from_unit, to_unit)
+
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_bench_cached(benchmark, dimension):
+    from_unit, to_unit = SAMPLE_PAIRS[dimension]
+    cached = ConversionCache(CONVERTERS[dimension])
+    cached(123.456, from_unit, to_unit)
+    benchmark.group = "cached"
+    benchmark(cached, 123.456, from_unit, to_unit)
+
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_bench_batch(benchmark, dimension):
+    np = pytest.importorskip("numpy")
+
+    from_unit, to_unit = SAMPLE_PAIRS[dimension]
+    values = np.random.default_rng(0).uniform(0, 1000, 100_000)
+    out = np.empty_like(values)
+    benchmark.group = "batch-100k"
+    benchmark(convert_array, values, from_unit, to_unit, out=out)
+
+
+@pytest.mark.parametrize("dimension", list(CONVERTERS))
+def test_bench_kernel(benchmark, dimension):
+    kernel = get_converter(*SAMPLE_PAIRS[dimension])
+    benchmark.group = "scalar"
+    benchmark(kernel, 123.456)
+
+
+def test_bench_factor_lookup(benchmark):
+    benchmark.group = "lookup"
+    benchmark(get_factor, "PSI", "Pascal")
+
+
+def test_bench_factor_lookup_ids(benchmark):
+    benchmark.group = "lookup"
+    benchmark(get_factor, unit_id("PSI"), unit_id("Pascal"))
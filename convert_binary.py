@@ -0,0 +1,103 @@
+# Out-of-core conversion of flat binary telemetry files (raw float32/float64
+# values, no header). The file is memory-mapped one block at a time, so the
+# working set stays at one block however large the file is, and the full
+# file is never loaded.
+#
+#   python convert_binary.py pressure.f32 pressure_pa.f32 --from PSI --to Pascal --dtype float32
+#   python convert_binary.py energy.f64 --in-place --from Watt-hour --to Joule
+import argparse
+import os
+import sys
+import time
+
+from units import ConversionError, convert_array, get_factor
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024  # elements per block
+
+
+def _element_count(path, dtype):
+    size = os.path.getsize(path)
+    if size % dtype.itemsize:
+        raise ValueError(f"{path} is {size} bytes, not a whole number of {dtype} values")
+    return size // dtype.itemsize
+
+
+def convert_binary(src, dst, from_unit, to_unit, dtype="float64", out_dtype=None,
+                   block_size=DEFAULT_BLOCK_SIZE):
+    # Converts src into dst block by block and returns the number of values.
+    # dst=None (or dst being src, under any name) converts in place, which requires the output
+    # dtype to match the input.
+    import numpy as np
+
+    get_factor(from_unit, to_unit)  # fail before touching any file
+    dtype = np.dtype(dtype)
+    out_dtype = np.dtype(out_dtype) if out_dtype is not None else dtype
+    count = _element_count(src, dtype)
+    # samefile also catches symlinks and hard links to src, which would
+    # otherwise be truncated as a separate output before src is read
+    in_place = dst is None or (os.path.exists(dst) and os.path.samefile(dst, src))
+    if in_place and out_dtype != dtype:
+        raise ValueError("In-place conversion cannot change the dtype")
+
+    # Widening output (float32 -> float64) is computed at the output
+    # precision, one block-sized copy at a time
+    widen = np.promote_types(dtype, out_dtype).itemsize > dtype.itemsize
+
+    if not in_place:
+        # Preallocate the output (sparse where the filesystem allows it)
+        with open(dst, "wb") as handle:
+            handle.truncate(count * out_dtype.itemsize)
+
+    for start in range(0, count, block_size):
+        length = min(block_size, count - start)
+        # Each block gets its own short-lived mapping, so pages from earlier
+        # blocks are unmapped and the resident set stays bounded
+        source = np.memmap(src, dtype=dtype, mode="r+" if in_place else "r",
+                           offset=start * dtype.itemsize, shape=(length,))
+        target = source if in_place else np.memmap(
+            dst, dtype=out_dtype, mode="r+", offset=start * out_dtype.itemsize, shape=(length,))
+        if widen:
+            source = source.astype(out_dtype)
+        convert_array(source, from_unit, to_unit, out=target)
+        target.flush()
+        del source, target
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a raw float32/float64 binary file between units.")
+    parser.add_argument("src", help="input file of raw values")
+    parser.add_argument("dst", nargs="?", help="output file (omit with --in-place)")
+    parser.add_argument("--from", dest="from_unit", required=True, help="unit of the input values")
+    parser.add_argument("--to", dest="to_unit", required=True, help="unit to convert to")
+    parser.add_argument("--dtype", default="float64",
+                        help="input dtype, e.g. float32, float64, >f4 (default float64)")
+    parser.add_argument("--out-dtype", help="output dtype (default: same as input)")
+    parser.add_argument("--in-place", action="store_true", help="overwrite src with the converted values")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE,
+                        help=f"values per block (default {DEFAULT_BLOCK_SIZE})")
+    args = parser.parse_args(argv)
+
+    if args.in_place == bool(args.dst):
+        parser.error("give either an output file or --in-place")
+    try:
+        get_factor(args.from_unit, args.to_unit)
+    except ConversionError as exc:
+        parser.error(str(exc))
+
+    start = time.perf_counter()
+    try:
+        count = convert_binary(args.src, args.dst, args.from_unit, args.to_unit,
+                               args.dtype, args.out_dtype, args.block_size)
+    except (OSError, ValueError, TypeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    nbytes = os.path.getsize(args.src)
+    rate = nbytes / elapsed / 1e9 if elapsed else float("inf")
+    print(f"{count} values ({nbytes / 1e9:.2f} GB) in {elapsed:.2f}s ({rate:.2f} GB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
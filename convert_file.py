@@ -0,0 +1,217 @@
+# Headless file conversion: streams a CSV or Parquet file in chunks and
+# converts named columns between units with the registry in units.py.
+#
+#   python convert_file.py telemetry.csv out.csv --col pressure:PSI->Pascal
+#   python convert_file.py telemetry.parquet out.parquet --col energy:Watt-hour->Joule
+#   python convert_file.py big.csv out.csv --col pressure:PSI->Pascal --workers 8
+#
+# CSV cells that are empty or not numbers are written out empty, like the
+# app's batch tab does, rather than aborting a long job halfway.
+import argparse
+import csv
+import math
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from units import ConversionError, convert_array, get_factor
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def parse_column_spec(text):
+    # "column:From Unit->To Unit" -> (column, from_unit, to_unit)
+    column, sep, units = text.partition(":")
+    from_unit, arrow, to_unit = units.partition("->")
+    if not sep or not arrow or not column:
+        raise ValueError(f"Expected COLUMN:FROM->TO, got '{text}'")
+    from_unit, to_unit = from_unit.strip(), to_unit.strip()
+    try:
+        get_factor(from_unit, to_unit)
+    except ConversionError:
+        raise ValueError(f"Cannot convert '{from_unit}' to '{to_unit}'") from None
+    return column, from_unit, to_unit
+
+
+def _is_parquet(path):
+    return path.endswith((".parquet", ".pq"))
+
+
+def _number(cell):
+    try:
+        return float(cell)
+    except ValueError:
+        return math.nan
+
+
+def _csv_column(rows, index):
+    import numpy as np
+
+    # Empty and non-numeric cells become NaN and are written back out empty
+    cells = [row[index] or "nan" for row in rows]
+    try:
+        return np.array(cells, dtype=np.float64)
+    except ValueError:
+        # Only chunks holding a non-numeric cell take the per-cell path
+        return np.array([_number(cell) for cell in cells], dtype=np.float64)
+
+
+def _iter_chunks(reader, chunk_size):
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        yield rows
+
+
+def _map_ordered(func, chunks, extra, workers):
+    # Applies func(chunk, extra) to every chunk, yielding results in input
+    # order. With workers > 1 chunks run on a process pool; at most two
+    # chunks per worker are in flight so memory stays bounded.
+    if workers <= 1:
+        for chunk in chunks:
+            yield func(chunk, extra)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk, extra))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _convert_rows(rows, targets):
+    # Rows too short to reach a converted column are padded with empty cells
+    width = max((index for index, _, _ in targets), default=-1) + 1
+    for row in rows:
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+    for index, from_unit, to_unit in targets:
+        converted = convert_array(_csv_column(rows, index), from_unit, to_unit)
+        for row, value in zip(rows, converted.tolist()):
+            row[index] = "" if value != value else repr(value)
+    return rows
+
+
+def convert_csv(src, dst, specs, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    # Only a bounded number of chunks is held in memory at a time
+    rows_done = 0
+    with open(src, newline="") as fin, open(dst, "w", newline="") as fout:
+        reader = csv.reader(fin)
+        writer = csv.writer(fout)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError(f"{src} is empty")
+        writer.writerow(header)
+        try:
+            targets = [(header.index(column), from_unit, to_unit)
+                       for column, from_unit, to_unit in specs]
+        except ValueError as exc:
+            raise ValueError(f"Column not found in {src}: {exc}") from None
+
+        chunks = _iter_chunks(reader, chunk_size)
+        for rows in _map_ordered(_convert_rows, chunks, targets, workers):
+            writer.writerows(rows)
+            rows_done += len(rows)
+    return rows_done
+
+
+def _convert_columns(columns, units):
+    return [convert_array(values, from_unit, to_unit)
+            for values, (from_unit, to_unit) in zip(columns, units)]
+
+
+def convert_parquet(src, dst, specs, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet support requires the 'pyarrow' package") from None
+
+    source = pq.ParquetFile(src)
+    names = source.schema_arrow.names
+    missing = [column for column, _, _ in specs if column not in names]
+    if missing:
+        raise ValueError(f"Column not found in {src}: {', '.join(missing)}")
+
+    indices = [names.index(column) for column, _, _ in specs]
+    units = [(from_unit, to_unit) for _, from_unit, to_unit in specs]
+    batches = deque()
+
+    def column_chunks():
+        # Only the columns being converted are shipped to workers; the
+        # batches wait here until their results come back in order.
+        for batch in source.iter_batches(batch_size=chunk_size):
+            batches.append(batch)
+            yield [batch.column(index).to_numpy(zero_copy_only=False) for index in indices]
+
+    rows_done = 0
+    writer = None
+    try:
+        for converted in _map_ordered(_convert_columns, column_chunks(), units, workers):
+            batch = batches.popleft()
+            columns = list(batch.columns)
+            for index, values in zip(indices, converted):
+                columns[index] = pa.array(values)
+            table = pa.Table.from_arrays(columns, names=names)
+            if writer is None:
+                writer = pq.ParquetWriter(dst, table.schema)
+            writer.write_table(table)
+            rows_done += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_done
+
+
+def convert_file(src, dst, specs, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    if _is_parquet(src) != _is_parquet(dst):
+        raise ValueError("Input and output must both be CSV or both be Parquet")
+    if _is_parquet(src):
+        return convert_parquet(src, dst, specs, chunk_size, workers)
+    return convert_csv(src, dst, specs, chunk_size, workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert unit columns of a CSV or Parquet file.")
+    parser.add_argument("src", help="input .csv or .parquet file")
+    parser.add_argument("dst", help="output file, same format as the input")
+    parser.add_argument("--col", action="append", required=True, metavar="COLUMN:FROM->TO",
+                        help="column to convert, e.g. 'pressure:PSI->Pascal' (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per chunk (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; chunks stay in input order (default 1)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="run under cProfile and write the stats to PATH (.prof)")
+    args = parser.parse_args(argv)
+
+    try:
+        specs = [parse_column_spec(text) for text in args.col]
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    start = time.perf_counter()
+    try:
+        if args.profile:
+            from instrumentation import profile_run
+
+            rows = profile_run(convert_file, args.src, args.dst, specs, args.chunk_size,
+                               args.workers, output=args.profile)
+        else:
+            rows = convert_file(args.src, args.dst, specs, args.chunk_size, args.workers)
+    except (ValueError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"{rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# Conversion functions, importable without Streamlit. Every converter is a
+# single lookup into the precomputed registry in units.py followed by one
+# multiply-add. Invalid units raise units.UnknownUnitError or
+# units.IncompatibleUnitsError (both ConversionError and KeyError subclasses).
+from units import PAIRS, invalid_pair
+
+LENGTH_PAIRS = PAIRS["Length"]
+WEIGHT_PAIRS = PAIRS["Weight"]
+TEMPERATURE_PAIRS = PAIRS["Temperature"]
+VOLUME_PAIRS = PAIRS["Volume"]
+SPEED_PAIRS = PAIRS["Speed"]
+TIME_PAIRS = PAIRS["Time"]
+AREA_PAIRS = PAIRS["Area"]
+PRESSURE_PAIRS = PAIRS["Pressure"]
+ENERGY_PAIRS = PAIRS["Energy"]
+POWER_PAIRS = PAIRS["Power"]
+STORAGE_PAIRS = PAIRS["Storage"]
+FREQUENCY_PAIRS = PAIRS["Frequency"]
+ANGLE_PAIRS = PAIRS["Angle"]
+
+def length_converter(value, from_unit, to_unit):
+    pair = LENGTH_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Length", from_unit, to_unit)
+    return value * pair[0]
+
+def weight_converter(value, from_unit, to_unit):
+    pair = WEIGHT_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Weight", from_unit, to_unit)
+    return value * pair[0]
+
+def temperature_converter(value, from_unit, to_unit):
+    pair = TEMPERATURE_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Temperature", from_unit, to_unit)
+    return value * pair[0] + pair[1]
+
+def volume_converter(value, from_unit, to_unit):
+    pair = VOLUME_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Volume", from_unit, to_unit)
+    return value * pair[0]
+
+def speed_converter(value, from_unit, to_unit):
+    pair = SPEED_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Speed", from_unit, to_unit)
+    return value * pair[0]
+
+def time_converter(value, from_unit, to_unit):
+    pair = TIME_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Time", from_unit, to_unit)
+    return value * pair[0]
+
+def area_converter(value, from_unit, to_unit):
+    pair = AREA_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Area", from_unit, to_unit)
+    return value * pair[0]
+
+def pressure_converter(value, from_unit, to_unit):
+    pair = PRESSURE_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Pressure", from_unit, to_unit)
+    return value * pair[0]
+
+def energy_converter(value, from_unit, to_unit):
+    pair = ENERGY_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Energy", from_unit, to_unit)
+    return value * pair[0]
+
+def power_converter(value, from_unit, to_unit):
+    pair = POWER_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Power", from_unit, to_unit)
+    return value * pair[0]
+
+def storage_converter(value, from_unit, to_unit):
+    pair = STORAGE_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Storage", from_unit, to_unit)
+    return value * pair[0]
+
+def frequency_converter(value, from_unit, to_unit):
+    pair = FREQUENCY_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Frequency", from_unit, to_unit)
+    return value * pair[0]
+
+def angle_converter(value, from_unit, to_unit):
+    pair = ANGLE_PAIRS.get((from_unit, to_unit))
+    if pair is None:
+        raise invalid_pair("Angle", from_unit, to_unit)
+    return round(value * pair[0], 2)  # Ensuring float output
+
+
+# Converter per dimension, in the order of units.DIMENSIONS
+CONVERTERS = {
+    "Length": length_converter,
+    "Weight": weight_converter,
+    "Temperature": temperature_converter,
+    "Volume": volume_converter,
+    "Speed": speed_converter,
+    "Time": time_converter,
+    "Area": area_converter,
+    "Pressure": pressure_converter,
+    "Energy": energy_converter,
+    "Power": power_converter,
+    "Storage": storage_converter,
+    "Frequency": frequency_converter,
+    "Angle": angle_converter,
+}
@@ -0,0 +1,170 @@
+# Exact conversions for billing-grade totals. The float registry in units.py
+# stays the fast default; this module swaps its rounded table entries
+# (2.20462 lb/kg, 57.2958 °/rad, 2.237 mph, ...) for the defined constants and
+# does the arithmetic with fractions.Fraction or decimal.Decimal.
+#
+#   convert_exact("12.5", "Kilowatt-hour", "Joule")             # Fraction(45000000, 1)
+#   convert_exact(Decimal("1"), "Pound", "Gram", mode="decimal")  # Decimal('453.59237')
+from decimal import Decimal, getcontext
+from fractions import Fraction
+from functools import lru_cache
+
+from units import IncompatibleUnitsError, UnknownUnitError
+
+MODES = ("fraction", "decimal")
+
+_FOOT = Fraction("0.3048")
+_POUND = Fraction("0.45359237")
+_STANDARD_GRAVITY = Fraction("9.80665")
+_POUND_FORCE = _POUND * _STANDARD_GRAVITY
+# π is irrational, so the radian is exact only to the 60 digits given here
+_PI = Fraction("3.14159265358979323846264338327950288419716939937510582097494")
+
+# Base units per unit, as in units.py, with (scale, offset) for affine units
+EXACT_TABLES = {
+    "Length": {
+        "Meter": Fraction(1),
+        "Kilometer": Fraction(1000),
+        "Centimeter": Fraction(1, 100),
+    },
+    "Weight": {
+        "Kilogram": Fraction(1),
+        "Gram": Fraction(1, 1000),
+        "Pound": _POUND,
+    },
+    "Temperature": {
+        "Kelvin": Fraction(1),
+        "Celsius": (Fraction(1), Fraction("273.15")),
+        "Fahrenheit": (Fraction(5, 9), Fraction("273.15") - Fraction(160, 9)),
+    },
+    "Volume": {
+        "Liter": Fraction(1),
+        "Milliliter": Fraction(1, 1000),
+        "Cubic Meter": Fraction(1000),
+        "Cubic Centimeter": Fraction(1, 1000),
+        "Cubic Inch": Fraction("0.016387064"),
+        "Cubic Foot": Fraction("28.316846592"),
+        "Gallon (US)": Fraction("3.785411784"),
+    },
+    "Speed": {
+        "Meters per Second (m/s)": Fraction(1),
+        "Kilometers per Hour (km/h)": Fraction(1000, 3600),
+        "Miles per Hour (mph)": Fraction("0.44704"),
+        "Feet per Second (ft/s)": _FOOT,
+        "Knots": Fraction(1852, 3600),
+    },
+    "Time": {
+        "Second": Fraction(1),
+        "Minute": Fraction(60),
+        "Hour": Fraction(3600),
+        "Day": Fraction(86400),
+        "Week": Fraction(604800),
+    },
+    "Area": {
+        "Square Meter": Fraction(1),
+        "Square Kilometer": Fraction(10**6),
+        "Square Centimeter": Fraction(1, 10**4),
+        "Square Foot": _FOOT**2,
+        "Square Inch": Fraction("0.0254")**2,
+        "Acre": Fraction("4046.8564224"),
+        "Hectare": Fraction(10000),
+    },
+    "Pressure": {
+        "Pascal": Fraction(1),
+        "Bar": Fraction(100000),
+        "PSI": _POUND_FORCE / Fraction("0.0254")**2,
+        "Atmosphere": Fraction(101325),
+        "Torr": Fraction(101325, 760),
+    },
+    "Energy": {
+        "Joule": Fraction(1),
+        "Kilojoule": Fraction(1000),
+        "Calorie": Fraction("4.184"),
+        "Kilocalorie": Fraction(4184),
+        "Watt-hour": Fraction(3600),
+        "Kilowatt-hour": Fraction(3600000),
+        "Electronvolt": Fraction("1.602176634e-19"),
+    },
+    "Power": {
+        "Watt": Fraction(1),
+        "Kilowatt": Fraction(1000),
+        "Horsepower": 550 * _FOOT * _POUND_FORCE,  # mechanical horsepower
+        "Megawatt": Fraction(10**6),
+        "Gigawatt": Fraction(10**9),
+        "BTU/hour": Fraction("1055.05585262") / 3600,  # International Table BTU
+        "Foot-pound/minute": _FOOT * _POUND_FORCE / 60,
+    },
+    "Storage": {
+        "Byte": Fraction(1),
+        "Kilobyte": Fraction(1024),
+        "Megabyte": Fraction(1024**2),
+        "Gigabyte": Fraction(1024**3),
+        "Terabyte": Fraction(1024**4),
+        "Petabyte": Fraction(1024**5),
+    },
+    "Frequency": {
+        "Hertz": Fraction(1),
+        "Kilohertz": Fraction(10**3),
+        "Megahertz": Fraction(10**6),
+        "Gigahertz": Fraction(10**9),
+    },
+    "Angle": {
+        "Degree": Fraction(1),
+        "Radian": 180 / _PI,
+        "Gradian": Fraction(9, 10),
+    },
+}
+
+_EXACT_ENTRIES = {
+    unit: entry if isinstance(entry, tuple) else (entry, Fraction(0))
+    for table in EXACT_TABLES.values()
+    for unit, entry in table.items()
+}
+_UNIT_DIMENSION = {unit: dimension
+                   for dimension, table in EXACT_TABLES.items()
+                   for unit in table}
+
+
+@lru_cache(maxsize=None)
+def get_exact_factor(from_unit, to_unit):
+    # Exact (factor, offset) as Fractions; raises the same typed errors as
+    # units.get_factor
+    for unit in (from_unit, to_unit):
+        if unit not in _UNIT_DIMENSION:
+            raise UnknownUnitError(unit)
+    if _UNIT_DIMENSION[from_unit] != _UNIT_DIMENSION[to_unit]:
+        raise IncompatibleUnitsError(from_unit, to_unit)
+    from_scale, from_offset = _EXACT_ENTRIES[from_unit]
+    to_scale, to_offset = _EXACT_ENTRIES[to_unit]
+    return from_scale / to_scale, (from_offset - to_offset) / to_scale
+
+
+@lru_cache(maxsize=None)
+def _decimal_factor(from_unit, to_unit, precision):
+    factor, offset = get_exact_factor(from_unit, to_unit)
+    return (Decimal(factor.numerator) / factor.denominator,
+            Decimal(offset.numerator) / offset.denominator)
+
+
+def _as_fraction(value):
+    # Floats are taken at their shortest repr, i.e. the number as written
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def convert_exact(value, from_unit, to_unit, mode="fraction"):
+    # value may be an int, str, float, Fraction or Decimal.
+    #   mode="fraction": exact rational result
+    #   mode="decimal":  Decimal result at the current decimal context precision
+    if mode == "fraction":
+        factor, offset = get_exact_factor(from_unit, to_unit)
+        return _as_fraction(value) * factor + offset
+    if mode == "decimal":
+        factor, offset = _decimal_factor(from_unit, to_unit, getcontext().prec)
+        if isinstance(value, float):
+            value = repr(value)
+        elif isinstance(value, Fraction):
+            value = Decimal(value.numerator) / value.denominator
+        return Decimal(value) * factor + offset
+    raise ValueError(f"mode must be one of {MODES}, got '{mode}'")
@@ -0,0 +1,225 @@
+# Compound unit expressions such as "kg*m/s^2", "kWh/day" or "GiB/s".
+#
+# An expression is parsed once into a UnitPlan: its scale relative to the
+# coherent base units (m, kg, s, K, byte, degree) and its dimension as a
+# tuple of exponents. Plans and pairwise factors are cached by string, so
+# repeated conversions pay no parsing cost after the first call.
+#
+#   convert_expression(3, "kWh/day", "W")   # 125.0
+#   convert_expression(1, "GiB/s", "MB/min")
+#
+# Errors follow units.py: UnknownUnitError, IncompatibleUnitsError, and
+# InvalidExpressionError for expressions that do not parse.
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from units import (DIMENSIONS, PAIRS, ConversionError, IncompatibleUnitsError, UnknownUnitError,
+                   get_factor)
+
+
+# Also a ValueError, which is what bad expressions raised before there were
+# typed errors
+class InvalidExpressionError(ConversionError, ValueError):
+    pass
+
+
+UnitPlan = namedtuple("UnitPlan", "scale offset dimension")
+
+# Exponents of (length, mass, time, temperature, data, angle)
+_DIMENSION_VECTORS = {
+    "Length": (1, 0, 0, 0, 0, 0),
+    "Weight": (0, 1, 0, 0, 0, 0),
+    "Time": (0, 0, 1, 0, 0, 0),
+    "Temperature": (0, 0, 0, 1, 0, 0),
+    "Storage": (0, 0, 0, 0, 1, 0),
+    "Angle": (0, 0, 0, 0, 0, 1),
+    "Area": (2, 0, 0, 0, 0, 0),
+    "Volume": (3, 0, 0, 0, 0, 0),
+    "Speed": (1, 0, -1, 0, 0, 0),
+    "Frequency": (0, 0, -1, 0, 0, 0),
+    "Pressure": (-1, 1, -2, 0, 0, 0),
+    "Energy": (2, 1, -2, 0, 0, 0),
+    "Power": (2, 1, -3, 0, 0, 0),
+}
+_DIMENSIONLESS = (0, 0, 0, 0, 0, 0)
+
+# Size of each dimension's registry base unit in coherent base units; the
+# Liter is the only base unit that is not coherent (1 L = 1e-3 m³)
+_BASE_SCALE = {"Volume": 1e-3}
+
+SYMBOLS = {
+    "m": "Meter", "km": "Kilometer", "cm": "Centimeter",
+    "kg": "Kilogram", "g": "Gram", "lb": "Pound",
+    "K": "Kelvin", "°C": "Celsius", "degC": "Celsius", "°F": "Fahrenheit", "degF": "Fahrenheit",
+    "L": "Liter", "mL": "Milliliter", "cc": "Cubic Centimeter", "gal": "Gallon (US)",
+    "mph": "Miles per Hour (mph)", "kn": "Knots", "knot": "Knots",
+    "s": "Second", "min": "Minute", "h": "Hour", "day": "Day", "week": "Week",
+    "ha": "Hectare", "acre": "Acre",
+    "Pa": "Pascal", "bar": "Bar", "psi": "PSI", "atm": "Atmosphere",
+    "J": "Joule", "kJ": "Kilojoule", "cal": "Calorie", "kcal": "Kilocalorie",
+    "Wh": "Watt-hour", "kWh": "Kilowatt-hour", "eV": "Electronvolt",
+    "W": "Watt", "kW": "Kilowatt", "MW": "Megawatt", "GW": "Gigawatt", "hp": "Horsepower",
+    # Storage units in the registry are binary multiples
+    "B": "Byte", "KB": "Kilobyte", "MB": "Megabyte", "GB": "Gigabyte", "TB": "Terabyte",
+    "PB": "Petabyte", "KiB": "Kilobyte", "MiB": "Megabyte", "GiB": "Gigabyte",
+    "TiB": "Terabyte", "PiB": "Petabyte",
+    "Hz": "Hertz", "kHz": "Kilohertz", "MHz": "Megahertz", "GHz": "Gigahertz",
+    "°": "Degree", "deg": "Degree", "rad": "Radian", "grad": "Gradian", "gon": "Gradian",
+}
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?)|([A-Za-z_°][\w°]*)|(\*\*|[*/^()·-]))")
+
+
+def _atoms():
+    # symbol or single-word unit name -> (scale, offset, dimension, affine)
+    atoms = {}
+    for dimension, units in DIMENSIONS.items():
+        base = units[0]
+        vector = _DIMENSION_VECTORS[dimension]
+        base_scale = _BASE_SCALE.get(dimension, 1.0)
+        for unit in units:
+            factor, offset = PAIRS[dimension][(unit, base)]
+            atoms[unit] = (factor * base_scale, offset, vector, offset != 0)
+    for symbol, unit in SYMBOLS.items():
+        atoms[symbol] = atoms[unit]
+    return atoms
+
+
+_ATOMS = _atoms()
+
+# Symbol or unit name -> registry unit name, for expressions that are a
+# single plain unit
+_REGISTRY_UNITS = {**{unit: unit for units in DIMENSIONS.values() for unit in units}, **SYMBOLS}
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise InvalidExpressionError(
+                f"Invalid unit expression '{text}': unexpected character at position {position}")
+        tokens.append(match.groups())
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    # expr   := term (('*' | '·' | '/') term)*
+    # term   := factor (('^' | '**') ['-'] integer)?
+    # factor := NAME | NUMBER | '(' expr ')'
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def error(self, message):
+        return InvalidExpressionError(f"Invalid unit expression '{self.text}': {message}")
+
+    def peek_op(self):
+        if self.index < len(self.tokens):
+            return self.tokens[self.index][2]
+        return None
+
+    def next(self):
+        if self.index >= len(self.tokens):
+            raise self.error("unexpected end")
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def parse(self):
+        scale, dimension = self.expr()
+        if self.index != len(self.tokens):
+            raise self.error("unexpected trailing input")
+        return scale, dimension
+
+    def expr(self):
+        scale, dimension = self.term()
+        while self.peek_op() in ("*", "·", "/"):
+            op = self.next()[2]
+            rhs_scale, rhs_dimension = self.term()
+            sign = -1 if op == "/" else 1
+            scale = scale * rhs_scale if sign == 1 else scale / rhs_scale
+            dimension = tuple(a + sign * b for a, b in zip(dimension, rhs_dimension))
+        return scale, dimension
+
+    def term(self):
+        scale, dimension = self.factor()
+        if self.peek_op() in ("^", "**"):
+            self.next()
+            sign = 1
+            if self.peek_op() == "-":
+                self.next()
+                sign = -1
+            number = self.next()[0]
+            if number is None or not number.isdigit():
+                raise self.error("exponents must be integers")
+            power = sign * int(number)
+            scale = scale ** power
+            dimension = tuple(a * power for a in dimension)
+        return scale, dimension
+
+    def factor(self):
+        number, name, op = self.next()
+        if number is not None:
+            return float(number), _DIMENSIONLESS
+        if name is not None:
+            try:
+                scale, offset, dimension, affine = _ATOMS[name]
+            except KeyError:
+                raise UnknownUnitError(name) from None
+            if affine:
+                raise self.error(f"'{name}' has an offset and can only be used on its own")
+            return scale, dimension
+        if op == "(":
+            result = self.expr()
+            if self.peek_op() != ")":
+                raise self.error("missing ')'")
+            self.next()
+            return result
+        raise self.error(f"unexpected '{op}'")
+
+
+@lru_cache(maxsize=1024)
+def compile_unit(text):
+    # Parse an expression (or a single unit name/symbol) into a UnitPlan
+    atom = _ATOMS.get(text.strip())
+    if atom is not None:
+        scale, offset, dimension, _ = atom
+        return UnitPlan(scale, offset, dimension)
+    scale, dimension = _Parser(text).parse()
+    return UnitPlan(scale, 0.0, dimension)
+
+
+@lru_cache(maxsize=1024)
+def get_expression_factor(from_text, to_text):
+    # (factor, offset) taking values in from_text to to_text
+    from_unit = _REGISTRY_UNITS.get(from_text.strip())
+    to_unit = _REGISTRY_UNITS.get(to_text.strip())
+    if from_unit is not None and to_unit is not None:
+        # Two plain units: the registry's exactly folded pair, so affine
+        # units (°F -> °C) are not rounded on a trip through Kelvin
+        try:
+            return get_factor(from_unit, to_unit)
+        except IncompatibleUnitsError:
+            raise IncompatibleUnitsError(from_text, to_text) from None
+    source = compile_unit(from_text)
+    target = compile_unit(to_text)
+    if source.dimension != target.dimension:
+        raise IncompatibleUnitsError(from_text, to_text)
+    factor = source.scale / target.scale
+    offset = (source.offset - target.offset) / target.scale
+    return factor, offset
+
+
+def convert_expression(value, from_text, to_text):
+    # Works on scalars and NumPy arrays alike
+    factor, offset = get_expression_factor(from_text, to_text)
+    if offset:
+        return value * factor + offset
+    return value * factor
@@ -0,0 +1,110 @@
+# Human-readable output: pick the most readable unit of a dimension for a
+# value, e.g. 1_572_864 Byte -> 1.50 Megabyte, 4.2e7 Joule -> 11.67
+# Kilowatt-hour, 3.2e-19 Joule -> 2.00 Electronvolt.
+#
+# Each dimension has a ladder of display units ordered by size. For a given
+# source unit the ladder is turned once into a sorted table of thresholds
+# (the size of each ladder unit, expressed in the source unit) and the factors
+# into each ladder unit, so choosing a unit is a binary search over the
+# thresholds: bisect for scalars, np.searchsorted for whole arrays.
+#
+#   best_unit(1572864, "Byte")               # (1.5, 'Megabyte')
+#   format_best(4.2e7, "Joule")              # '11.67 Kilowatt-hour'
+#   best_unit_array(values, "Byte")          # (scaled values, unit names)
+from bisect import bisect_right
+from functools import lru_cache
+import math
+
+from units import DIMENSIONS, UNIT_DIMENSION, UnknownUnitError, get_factor
+
+# Display units per dimension, smallest first. Only plain SI/binary multiples
+# are used (no Pound, Calorie, Acre, ...); dimensions without a sensible
+# ladder (Temperature, Speed, Angle) are always shown in the unit given.
+SCALE_LADDERS = {
+    "Length": ("Centimeter", "Meter", "Kilometer"),
+    "Weight": ("Gram", "Kilogram"),
+    "Volume": ("Milliliter", "Liter", "Cubic Meter"),
+    "Time": ("Second", "Minute", "Hour", "Day", "Week"),
+    "Area": ("Square Centimeter", "Square Meter", "Hectare", "Square Kilometer"),
+    "Pressure": ("Pascal", "Bar"),
+    "Energy": ("Electronvolt", "Joule", "Kilojoule", "Kilowatt-hour"),
+    "Power": ("Watt", "Kilowatt", "Megawatt", "Gigawatt"),
+    "Storage": ("Byte", "Kilobyte", "Megabyte", "Gigabyte", "Terabyte", "Petabyte"),
+    "Frequency": ("Hertz", "Kilohertz", "Megahertz", "Gigahertz"),
+}
+
+
+@lru_cache(maxsize=None)
+def _scale_table(unit):
+    # (thresholds, units, factors, fallback index) for values given in unit:
+    #   thresholds[i]  size of units[i] in `unit` (ascending)
+    #   factors[i]     multiplier from `unit` to units[i]
+    # Zero and non-finite values use the dimension's base unit.
+    dimension = UNIT_DIMENSION.get(unit)
+    if dimension is None:
+        raise UnknownUnitError(unit)
+    units = SCALE_LADDERS.get(dimension)
+    if units is None:
+        return None
+    # Nudged down by a relative 1e-12 so that exactly one ladder unit (e.g.
+    # 100000 Centimeter) is not missed through rounding in the factors
+    thresholds = tuple(get_factor(ladder_unit, unit)[0] * (1 - 1e-12) for ladder_unit in units)
+    factors = tuple(get_factor(unit, ladder_unit)[0] for ladder_unit in units)
+    base = DIMENSIONS[dimension][0]
+    fallback = units.index(base) if base in units else 0
+    return thresholds, units, factors, fallback
+
+
+def best_unit(value, unit):
+    # (value in the best unit, best unit): the largest ladder unit that the
+    # value is at least one of, or the smallest ladder unit for tiny values
+    table = _scale_table(unit)
+    if table is None:
+        return value, unit
+    thresholds, units, factors, fallback = table
+    magnitude = abs(value)
+    if magnitude == 0 or not math.isfinite(magnitude):
+        index = fallback
+    else:
+        index = max(bisect_right(thresholds, magnitude) - 1, 0)
+    return value * factors[index], units[index]
+
+
+def format_number(value, precision=2):
+    # Fixed point, switching to scientific notation where fixed point would
+    # print 0.00 or a wall of digits
+    magnitude = abs(value)
+    if magnitude and math.isfinite(magnitude) and not 10**-precision <= magnitude < 1e15:
+        return f"{value:.{precision}e}"
+    return f"{value:.{precision}f}"
+
+
+def format_best(value, unit, precision=2):
+    scaled, scaled_unit = best_unit(value, unit)
+    return f"{format_number(scaled, precision)} {scaled_unit}"
+
+
+def best_unit_array(values, unit):
+    # Vectorised best_unit: returns (scaled float array, object array of unit
+    # names), one searchsorted over the thresholds for the whole array
+    import numpy as np
+
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.inexact):
+        values = values.astype(np.float64)
+    table = _scale_table(unit)
+    if table is None:
+        return values.copy(), np.full(values.shape, unit, dtype=object)
+    thresholds, units, factors, fallback = table
+    magnitudes = np.abs(values)
+    indices = np.searchsorted(np.asarray(thresholds), magnitudes, side="right") - 1
+    np.maximum(indices, 0, out=indices)
+    indices[(magnitudes == 0) | ~np.isfinite(magnitudes)] = fallback
+    scaled = values * np.asarray(factors, dtype=values.dtype)[indices]
+    return scaled, np.asarray(units, dtype=object)[indices]
+
+
+def format_best_array(values, unit, precision=2):
+    scaled, units = best_unit_array(values, unit)
+    return [f"{format_number(value, precision)} {scaled_unit}"
+            for value, scaled_unit in zip(scaled.tolist(), units.tolist())]
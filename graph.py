@@ -0,0 +1,62 @@
+# Conversion graph: units are nodes and every known conversion is an edge in
+# both directions. Any reachable pair is resolved once by a breadth-first
+# search that composes the (factor, offset) maps along the path; the
+# collapsed result is cached, so later lookups are a single dict hit.
+from collections import deque
+
+
+def _compose(first, second):
+    # Apply first, then second: (x * f1 + o1) * f2 + o2
+    f1, o1 = first
+    f2, o2 = second
+    return (f1 * f2, o1 * f2 + o2)
+
+
+def _invert(step):
+    factor, offset = step
+    return (1 / factor, -offset / factor)
+
+
+class ConversionGraph:
+
+    def __init__(self):
+        self.edges = {}
+        self.cache = {}
+
+    def __contains__(self, unit):
+        return unit in self.edges
+
+    def add_edge(self, from_unit, to_unit, factor, offset=0.0):
+        # value_in_to_unit = value_in_from_unit * factor + offset
+        if factor == 0:
+            raise ValueError("Conversion factor must be non-zero")
+        step = (factor, offset)
+        self.edges.setdefault(from_unit, {})[to_unit] = step
+        self.edges.setdefault(to_unit, {})[from_unit] = _invert(step)
+        # New edges can open shorter or previously missing paths
+        self.cache.clear()
+
+    def resolve(self, from_unit, to_unit):
+        # (factor, offset) from from_unit to to_unit; KeyError if unreachable
+        try:
+            return self.cache[(from_unit, to_unit)]
+        except KeyError:
+            pass
+        if from_unit not in self.edges or to_unit not in self.edges:
+            raise KeyError((from_unit, to_unit))
+
+        # One search fills the cache for every unit reached from from_unit
+        reached = {from_unit: (1.0, 0.0)}
+        queue = deque([from_unit])
+        while queue and to_unit not in reached:
+            unit = queue.popleft()
+            for neighbour, step in self.edges[unit].items():
+                if neighbour not in reached:
+                    reached[neighbour] = _compose(reached[unit], step)
+                    queue.append(neighbour)
+        for unit, pair in reached.items():
+            self.cache[(from_unit, unit)] = pair
+
+        if to_unit not in reached:
+            raise KeyError((from_unit, to_unit))
+        return reached[to_unit]
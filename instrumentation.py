@@ -0,0 +1,240 @@
+# Opt-in instrumentation for conversions: per-(dimension, from, to) call
+# counts, error counts and latency histograms, exported as Prometheus text or
+# JSON, plus a hook to run a batch under a profiler.
+#
+# Nothing here runs unless asked for. enable() swaps instrumented wrappers
+# into converters.py and disable() puts the originals back, so the disabled
+# cost there is exactly zero. Callers that bound a converter name before
+# enable() keep the uninstrumented function; look converters up via the
+# module or converters.CONVERTERS to pick up the switch.
+#
+# enable() also sets the recorder in units.py, so units.convert and the batch
+# paths built on units.convert_array (service.py, convert_file.py, stream.py)
+# are recorded too: a batch counts one call per element, with the batch's
+# total latency. Conversions in worker processes (parallel.py,
+# convert_file.py --workers) are not recorded.
+#
+#   recorder = instrumentation.enable()
+#   converters.pressure_converter(30, "PSI", "Bar")
+#   print(recorder.to_prometheus())
+#   instrumentation.disable()
+import io
+import json
+import threading
+import time
+from bisect import bisect_left
+from numbers import Integral
+
+import converters
+import units
+from units import UNIT_DIMENSION, UNIT_NAMES
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+class _Series:
+    __slots__ = ("count", "errors", "seconds", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        # One slot per bucket plus the +Inf overflow
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class Recorder:
+
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def record(self, dimension, from_unit, to_unit, seconds, error=False, calls=1):
+        # calls > 1 records a batch: seconds is then the batch total
+        key = (dimension, from_unit, to_unit)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _Series()
+            series.count += calls
+            series.errors += calls if error else 0
+            series.seconds += seconds
+            series.buckets[bisect_left(LATENCY_BUCKETS, seconds / calls)] += calls
+
+    def wrap(self, func, dimension=None):
+        # Instrumented version of a (value, from_unit, to_unit) converter;
+        # raised exceptions count as errors and are re-raised
+        perf_counter = time.perf_counter
+
+        def instrumented(value, from_unit, to_unit, *args, **kwargs):
+            started = perf_counter()
+            try:
+                result = func(value, from_unit, to_unit, *args, **kwargs)
+            except Exception:
+                self.record(*_series_key(from_unit, to_unit, dimension),
+                            perf_counter() - started, error=True)
+                raise
+            self.record(*_series_key(from_unit, to_unit, dimension), perf_counter() - started)
+            return result
+
+        instrumented.__name__ = func.__name__
+        instrumented.__wrapped__ = func
+        return instrumented
+
+    def call(self, func, values, from_unit, to_unit, *args):
+        # Run and record one conversion call of func(values, from_unit,
+        # to_unit, ...); array arguments count one call per element
+        started = time.perf_counter()
+        try:
+            result = func(values, from_unit, to_unit, *args)
+        except Exception:
+            self.record(*_series_key(from_unit, to_unit), time.perf_counter() - started,
+                        error=True, calls=_count(values))
+            raise
+        self.record(*_series_key(from_unit, to_unit), time.perf_counter() - started,
+                    calls=_count(result))
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {
+                    "dimension": dimension,
+                    "from": from_unit,
+                    "to": to_unit,
+                    "count": series.count,
+                    "errors": series.errors,
+                    "seconds": series.seconds,
+                    "buckets": list(series.buckets),
+                }
+                for (dimension, from_unit, to_unit), series in sorted(self.series.items())
+            ]
+
+    def to_json(self):
+        return json.dumps({"buckets": list(LATENCY_BUCKETS), "conversions": self.snapshot()})
+
+    def to_prometheus(self):
+        out = io.StringIO()
+        rows = self.snapshot()
+        out.write("# HELP unit_conversions_total Conversions performed.\n")
+        out.write("# TYPE unit_conversions_total counter\n")
+        for row in rows:
+            out.write(f"unit_conversions_total{{{_labels(row)}}} {row['count']}\n")
+        out.write("# HELP unit_conversion_errors_total Conversions that raised an error.\n")
+        out.write("# TYPE unit_conversion_errors_total counter\n")
+        for row in rows:
+            out.write(f"unit_conversion_errors_total{{{_labels(row)}}} {row['errors']}\n")
+        out.write("# HELP unit_conversion_seconds Conversion latency.\n")
+        out.write("# TYPE unit_conversion_seconds histogram\n")
+        for row in rows:
+            labels = _labels(row)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, row["buckets"]):
+                cumulative += count
+                out.write(f'unit_conversion_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}\n')
+            out.write(f'unit_conversion_seconds_bucket{{{labels},le="+Inf"}} {row["count"]}\n')
+            out.write(f"unit_conversion_seconds_sum{{{labels}}} {row['seconds']!r}\n")
+            out.write(f"unit_conversion_seconds_count{{{labels}}} {row['count']}\n")
+        return out.getvalue()
+
+
+def _unit_label(unit):
+    # Integer unit ids are recorded under their unit names; any other
+    # non-string argument (a bad id, None, ...) under its str(), so labels
+    # always sort and escape as text
+    if isinstance(unit, str):
+        return unit
+    if isinstance(unit, Integral) and 0 <= unit < len(UNIT_NAMES):
+        return UNIT_NAMES[unit]
+    return str(unit)
+
+
+def _series_key(from_unit, to_unit, dimension=None):
+    from_unit, to_unit = _unit_label(from_unit), _unit_label(to_unit)
+    return dimension or UNIT_DIMENSION.get(from_unit, "unknown"), from_unit, to_unit
+
+
+def _count(values):
+    size = getattr(values, "size", None)
+    if size is None:
+        try:
+            size = len(values)
+        except TypeError:
+            size = 1
+    return max(size, 1)
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(row):
+    return (f'dimension="{_escape(row["dimension"])}",'
+            f'from="{_escape(row["from"])}",to="{_escape(row["to"])}"')
+
+
+_originals = {}
+
+
+def enable(recorder=None):
+    # Instrument every converter in converters.py and the units.py entry
+    # points; returns the Recorder
+    recorder = recorder or Recorder()
+    disable()
+    units.set_recorder(recorder)
+    for dimension, func in converters.CONVERTERS.items():
+        _originals[dimension] = func
+        wrapped = recorder.wrap(func, dimension)
+        converters.CONVERTERS[dimension] = wrapped
+        setattr(converters, func.__name__, wrapped)
+    return recorder
+
+
+def disable():
+    units.set_recorder(None)
+    for dimension, func in _originals.items():
+        converters.CONVERTERS[dimension] = func
+        setattr(converters, func.__name__, func)
+    _originals.clear()
+
+
+def profile_run(func, *args, profiler="cprofile", output=None, **kwargs):
+    # Run func(*args, **kwargs) under a profiler and return its result.
+    #   profiler="cprofile":    deterministic; stats are dumped to output (a
+    #                           .prof path for snakeviz/pstats) or printed
+    #   profiler="pyinstrument": sampling, low overhead; requires pyinstrument
+    if profiler == "cprofile":
+        import cProfile
+        import pstats
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            if output:
+                profile.dump_stats(output)
+            else:
+                pstats.Stats(profile).sort_stats("cumulative").print_stats(25)
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError("Sampling profiles require the 'pyinstrument' package") from None
+
+        profile = Profiler()
+        profile.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.stop()
+            if output:
+                with open(output, "w") as handle:
+                    handle.write(profile.output_html())
+            else:
+                print(profile.output_text())
+    raise ValueError(f"Unknown profiler '{profiler}'")
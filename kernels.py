@@ -0,0 +1,107 @@
+# Specialised conversion kernels, one per (from_unit, to_unit) pair, for
+# callers in tight loops. A kernel is generated with compile() the first time
+# a pair is asked for: the pair's folded factor and offset are written into
+# its source as literals, so a call is a single multiply (plus an add for
+# affine units) with no dispatch, table lookups or validation.
+#
+#   to_kw = get_converter("Horsepower", "Kilowatt")   # fetch once...
+#   total = sum(to_kw(reading) for reading in readings)  # ...call directly
+#
+#   kernel = get_array_converter("PSI", "Pascal", backend="numba")
+#   kernel(values, out=values)
+#
+# Kernels are cached per pair. Changing a registered unit's definition after
+# its kernels were built needs get_converter.cache_clear() (and likewise for
+# get_array_converter).
+from functools import lru_cache
+import re
+
+from units import get_factor
+
+BACKENDS = ("numpy", "numba")
+
+
+def _kernel_name(from_unit, to_unit):
+    name = re.sub(r"\W+", "_", f"{from_unit}_to_{to_unit}".lower()).strip("_")
+    return name if name.isidentifier() else f"kernel_{name}"
+
+
+def _constants(from_unit, to_unit):
+    # Plain floats, whose repr is a valid literal; units registered with e.g.
+    # a NumPy scalar factor would otherwise write "np.float64(2.0)"
+    factor, offset = get_factor(from_unit, to_unit)
+    return float(factor), float(offset)
+
+
+def _expression(operand, factor, offset):
+    if offset:
+        return f"{operand} * {factor!r} + {offset!r}"
+    return f"{operand} * {factor!r}"
+
+
+def _generate(name, source, namespace=None):
+    namespace = dict(namespace or {})
+    exec(compile(source, f"<kernel {name}>", "exec"), namespace)
+    function = namespace[name]
+    function.__source__ = source
+    return function
+
+
+@lru_cache(maxsize=None)
+def get_converter(from_unit, to_unit):
+    # Scalar kernel value -> converted value. Raises UnknownUnitError or
+    # IncompatibleUnitsError when the pair cannot be converted.
+    factor, offset = _constants(from_unit, to_unit)
+    name = _kernel_name(from_unit, to_unit)
+    source = (f"def {name}(value):\n"
+              f"    return {_expression('value', factor, offset)}\n")
+    return _generate(name, source)
+
+
+@lru_cache(maxsize=None)
+def get_array_converter(from_unit, to_unit, backend="numpy"):
+    # Array kernel (values, out=None) -> converted array.
+    #   backend="numpy": vectorised ufunc calls with the constants bound in
+    #   backend="numba": one fused multiply-add loop compiled by Numba;
+    #                    requires numba, and out must be C-contiguous
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got '{backend}'")
+    factor, offset = _constants(from_unit, to_unit)
+    name = _kernel_name(from_unit, to_unit)
+    import numpy as np
+
+    if backend == "numpy":
+        add = f"    result += {offset!r}\n" if offset else ""
+        source = (f"def {name}(values, out=None):\n"
+                  f"    values = np.asarray(values)\n"
+                  f"    if not np.issubdtype(values.dtype, np.inexact):\n"
+                  f"        values = values.astype(np.float64)\n"
+                  f"    result = np.multiply(values, {factor!r}, out=out)\n"
+                  f"{add}"
+                  f"    return result\n")
+        return _generate(name, source, {"np": np})
+
+    try:
+        import numba
+    except ImportError:
+        raise RuntimeError("The numba backend requires the 'numba' package") from None
+
+    loop = _generate(f"{name}_loop",
+                     f"def {name}_loop(values, out):\n"
+                     f"    for index in range(values.shape[0]):\n"
+                     f"        out[index] = {_expression('values[index]', factor, offset)}\n")
+    compiled = numba.njit(loop)
+
+    def kernel(values, out=None):
+        values = np.ascontiguousarray(values)
+        if not np.issubdtype(values.dtype, np.inexact):
+            values = values.astype(np.float64)
+        if out is None:
+            out = np.empty_like(values)
+        elif not out.flags.c_contiguous or out.shape != values.shape:
+            raise ValueError("out must be a C-contiguous array shaped like values")
+        compiled(values.reshape(-1), out.reshape(-1))
+        return out
+
+    kernel.__name__ = name
+    return kernel
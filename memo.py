@@ -0,0 +1,81 @@
+# Bounded memoisation for conversion functions with hit/miss/eviction counts.
+#
+#   fast_temperature = ConversionCache(temperature_converter, maxsize=4096)
+#   fast_temperature(21.5, "Celsius", "Fahrenheit")
+#   fast_temperature.stats()  # CacheStats(hits=..., misses=..., ...)
+import math
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheStats = namedtuple("CacheStats", "hits misses evictions size maxsize hit_rate")
+
+POLICIES = ("lru", "fifo")
+
+_NAN = object()
+
+
+def _value_key(value):
+    # NaN never equals itself, so every NaN shares one sentinel key; 0.0 and
+    # -0.0 compare equal but convert to differently signed results, so the
+    # sign is kept. Everything else keys on its own value.
+    if value != value:
+        return _NAN
+    if value == 0:
+        return (0, math.copysign(1.0, value))
+    return value
+
+
+class ConversionCache:
+
+    def __init__(self, func, maxsize=1024, policy="lru"):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got '{policy}'")
+        self.func = func
+        self.maxsize = maxsize
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __call__(self, value, from_unit, to_unit):
+        key = (_value_key(value), from_unit, to_unit)
+        with self.lock:
+            try:
+                result = self.entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if self.policy == "lru":
+                    self.entries.move_to_end(key)
+                return result
+
+        # Exceptions propagate and nothing is stored
+        result = self.func(value, from_unit, to_unit)
+        with self.lock:
+            self.entries[key] = result
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups else 0.0
+            return CacheStats(self.hits, self.misses, self.evictions,
+                              len(self.entries), self.maxsize, hit_rate)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def memoize(maxsize=1024, policy="lru"):
+    # Decorator form of ConversionCache
+    def decorator(func):
+        return ConversionCache(func, maxsize, policy)
+    return decorator
@@ -0,0 +1,73 @@
+# Opt-in multi-core conversion of large NumPy arrays. The input and output
+# live in shared memory, so workers read and write their slice in place and
+# only the slice bounds are pickled. Slices map one-to-one onto the output,
+# so results always come back in input order.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from units import convert_array, get_factor
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def _convert_slice(src_name, dst_name, dtype, size, start, stop, from_unit, to_unit):
+    import numpy as np
+
+    src_shm = shared_memory.SharedMemory(name=src_name)
+    dst_shm = shared_memory.SharedMemory(name=dst_name)
+    try:
+        src = np.ndarray((size,), dtype=dtype, buffer=src_shm.buf)
+        dst = np.ndarray((size,), dtype=dtype, buffer=dst_shm.buf)
+        convert_array(src[start:stop], from_unit, to_unit, out=dst[start:stop])
+        # Views must be released before the blocks can be closed
+        del src, dst
+    finally:
+        src_shm.close()
+        dst_shm.close()
+
+
+def convert_array_parallel(values, from_unit, to_unit, workers=None,
+                           chunk_size=DEFAULT_CHUNK_SIZE, out=None):
+    # Same result as convert_array, split into chunk_size slices across a
+    # process pool. Falls back to the single-core path for small inputs.
+    import numpy as np
+
+    get_factor(from_unit, to_unit)  # fail fast on bad units, before forking
+    workers = workers or os.cpu_count() or 1
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.inexact):
+        values = values.astype(np.float64)
+    if workers == 1 or values.size <= chunk_size:
+        return convert_array(values, from_unit, to_unit, out=out)
+
+    size = values.size
+    nbytes = values.nbytes
+    src_shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    dst_shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        src = np.ndarray((size,), dtype=values.dtype, buffer=src_shm.buf)
+        src[:] = values.reshape(-1)
+        del src
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_convert_slice, src_shm.name, dst_shm.name, values.dtype.str,
+                            size, start, min(start + chunk_size, size), from_unit, to_unit)
+                for start in range(0, size, chunk_size)
+            ]
+            for future in futures:
+                future.result()
+
+        dst = np.ndarray(values.shape, dtype=values.dtype, buffer=dst_shm.buf)
+        if out is None:
+            out = dst.copy()
+        else:
+            out[...] = dst
+        del dst
+        return out
+    finally:
+        src_shm.close()
+        src_shm.unlink()
+        dst_shm.close()
+        dst_shm.unlink()
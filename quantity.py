@@ -0,0 +1,185 @@
+# Compact storage for converted values: a QuantityArray is one contiguous
+# float64/float32 buffer plus a single unit tag, instead of a list of
+# (value, unit-string) tuples. Quantity is the __slots__ scalar counterpart.
+#
+#   readings = QuantityArray([14.7, 29.4, 44.1], "PSI")
+#   in_bar = readings.to("Bar")        # one vectorised pass
+#   readings.to("PSI") is readings      # same unit: no copy
+#   in_bar.save("pressure.npy")
+#   mapped = QuantityArray.load("pressure.npy", mmap_mode="r")
+#   readings.to("Bar", out=readings.values)   # in place: readings is now in Bar
+from units import convert_array, convert_array_by_ids, get_factor, unit_id
+
+_FLOAT_DTYPES = ("float64", "float32")
+
+
+class Quantity:
+    __slots__ = ("value", "unit")
+
+    def __init__(self, value, unit):
+        self.value = value
+        self.unit = unit
+
+    def to(self, unit):
+        if unit == self.unit:
+            return self
+        factor, offset = get_factor(self.unit, unit)
+        return Quantity(self.value * factor + offset, unit)
+
+    def __eq__(self, other):
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        return self.value == other.value and self.unit == other.unit
+
+    def __hash__(self):
+        return hash((self.value, self.unit))
+
+    def __repr__(self):
+        return f"Quantity({self.value!r}, {self.unit!r})"
+
+
+class QuantityArray:
+    __slots__ = ("values", "unit")
+
+    def __init__(self, values, unit, dtype="float64"):
+        import numpy as np
+
+        if np.dtype(dtype).name not in _FLOAT_DTYPES:
+            raise ValueError(f"dtype must be one of {_FLOAT_DTYPES}, got '{dtype}'")
+        # No copy when values is already a contiguous array of this dtype,
+        # including memory-mapped arrays
+        self.values = np.ascontiguousarray(values, dtype=dtype)
+        self.unit = unit
+
+    @classmethod
+    def _view(cls, values, unit):
+        # Wrap an existing float array as-is, strided views included
+        quantities = cls.__new__(cls)
+        quantities.values = values
+        quantities.unit = unit
+        return quantities
+
+    @classmethod
+    def from_quantities(cls, quantities, unit, dtype="float64"):
+        # Collapse Quantity objects or (value, unit) tuples in mixed units
+        # into one array in `unit`, converting all rows in a single pass
+        import numpy as np
+
+        values = []
+        from_ids = []
+        for quantity in quantities:
+            value, from_unit = ((quantity.value, quantity.unit)
+                                if isinstance(quantity, Quantity) else quantity)
+            values.append(value)
+            from_ids.append(unit_id(from_unit))
+        converted = convert_array_by_ids(np.array(values, dtype=dtype), np.array(from_ids), unit_id(unit))
+        return cls(converted, unit, dtype)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        item = self.values[index]
+        if getattr(item, "ndim", 0) == 0:
+            return Quantity(item.item(), self.unit)
+        # Basic slices, strided ones included, are views into the same
+        # buffer; fancy indexing copies as it does in NumPy
+        return QuantityArray._view(item, self.unit)
+
+    def __iter__(self):
+        unit = self.unit
+        for value in self.values.tolist():
+            yield Quantity(value, unit)
+
+    def __array__(self, dtype=None, copy=None):
+        # Zero-copy hand-off to NumPy (np.asarray) unless a copy is asked for
+        # (np.array, copy=True) or a different dtype needs one
+        if dtype is None or self.values.dtype == dtype:
+            return self.values.copy() if copy else self.values
+        if copy is False:
+            raise ValueError(f"Converting {self.values.dtype} to {dtype} requires a copy")
+        return self.values.astype(dtype)
+
+    @property
+    def buffer(self):
+        # The values as a zero-copy memoryview, on any Python version
+        return memoryview(self.values)
+
+    def __buffer__(self, flags):
+        # PEP 688: memoryview(quantity_array) shares the buffer. Python
+        # classes only get the buffer protocol from 3.12; before that use
+        # .buffer (or np.asarray) instead.
+        return memoryview(self.values)
+
+    def __repr__(self):
+        return f"QuantityArray({self.values!r}, {self.unit!r})"
+
+    def to(self, unit, out=None):
+        # Returns self when the unit already matches and no out is given;
+        # otherwise converts in one vectorised pass, into `out` if given. The
+        # result takes out's dtype. out=self.values converts in place and
+        # retags self, which is returned.
+        import numpy as np
+
+        if out is not None:
+            if out.dtype.name not in _FLOAT_DTYPES:
+                raise ValueError(f"out dtype must be one of {_FLOAT_DTYPES}, got '{out.dtype}'")
+            if _same_array(out, self.values):
+                convert_array(self.values, self.unit, unit, out=out)
+                self.unit = unit
+                return self
+            if np.may_share_memory(out, self.values):
+                raise ValueError("out overlaps the values; pass the values array itself to convert in place")
+        if unit == self.unit:
+            if out is None:
+                return self
+            np.copyto(out, self.values)
+            return QuantityArray._view(out, unit)
+        result = convert_array(self.values, self.unit, unit, out=out)
+        return QuantityArray._view(result, unit)
+
+    def save(self, path):
+        # Plain .npy for the values, so the file can be memory-mapped; the
+        # unit goes in a small sidecar file next to it
+        import numpy as np
+
+        np.save(path, self.values, allow_pickle=False)
+        with open(_unit_path(path), "w", encoding="utf-8") as handle:
+            handle.write(self.unit)
+
+    @classmethod
+    def load(cls, path, unit=None, mmap_mode=None):
+        # mmap_mode="r" / "r+" maps the file instead of reading it. `unit`
+        # overrides the sidecar, e.g. for .npy files written elsewhere.
+        import numpy as np
+
+        values = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        if unit is None:
+            with open(_unit_path(path), encoding="utf-8") as handle:
+                unit = handle.read().strip()
+        return cls(values, unit, values.dtype)
+
+
+def _same_array(a, b):
+    # The same elements in the same layout, e.g. values and np.asarray(values)
+    return a is b or (a.shape == b.shape and a.strides == b.strides and a.dtype == b.dtype
+                      and a.__array_interface__["data"][0] == b.__array_interface__["data"][0])
+
+
+def _unit_path(path):
+    path = str(path)
+    if not path.endswith(".npy"):
+        path += ".npy"
+    return path + ".unit"
@@ -0,0 +1,295 @@
+# Currency and cost-per-unit conversions with time-varying rates, e.g. the
+# price of energy in USD/Kilowatt-hour or of storage in EUR/Gigabyte. Unlike
+# the static registry in units.py, these factors depend on when: every rate
+# series is a list of (timestamp, rate) points, and a conversion at time t
+# uses the latest point at or before t (an as-of lookup).
+#
+# Rates are read from a local CSV file or SQLite database, so everything works
+# offline. The CSV has a header and one rate per row; timestamps are epoch
+# seconds or ISO-8601:
+#
+#   timestamp,series,rate
+#   2024-01-01T00:00:00Z,USD/Kilowatt-hour,0.12
+#   2024-01-01T00:00:00Z,EUR/USD,0.91
+#
+# A series "A/B" is the price of one B in currency A. B is either a unit from
+# the registry ("Kilowatt-hour", "Gigabyte") or another currency ("USD").
+# Units of the currency dimension are currency codes and prices "CUR/UNIT":
+#
+#   store = RateStore.load("rates.csv")
+#   store.convert(350, "Kilowatt-hour", "USD", at="2024-03-01")   # cost
+#   store.convert(0.12, "USD/Kilowatt-hour", "EUR/Joule", at=ts)
+#   store.convert_array(kwh, timestamps, "Kilowatt-hour", "EUR")  # one as-of join
+import csv
+import sqlite3
+from bisect import bisect_right
+from datetime import datetime, timezone
+from numbers import Real
+
+from units import (UNIT_DIMENSION, ConversionError, IncompatibleUnitsError, UnknownUnitError,
+                   get_factor)
+
+
+class MissingRateError(ConversionError):
+    pass
+
+
+def to_timestamp(value):
+    # Epoch seconds from a number (NumPy scalars included), a datetime or an
+    # ISO-8601 string; naive datetimes are taken as UTC
+    if isinstance(value, Real):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise TypeError(f"Cannot use {value!r} as a timestamp")
+
+
+def _timestamps_array(timestamps):
+    import numpy as np
+
+    timestamps = np.asarray(timestamps)
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        return timestamps.astype("datetime64[ns]").astype(np.int64) / 1e9
+    if timestamps.dtype == object or timestamps.dtype.kind in "US":
+        return np.array([to_timestamp(value) for value in timestamps.ravel().tolist()]).reshape(
+            timestamps.shape)
+    return timestamps.astype(np.float64)
+
+
+def _split_series(series):
+    currency, slash, denominator = series.partition("/")
+    if not slash or not currency or not denominator:
+        raise ValueError(f"Rate series must look like 'CUR/UNIT', got '{series}'")
+    return currency.strip(), denominator.strip()
+
+
+class _Series:
+    __slots__ = ("timestamps", "rates")
+
+    def __init__(self):
+        self.timestamps = []
+        self.rates = []
+
+
+class RateStore:
+
+    def __init__(self):
+        self.series = {}         # (currency, denominator) -> _Series
+        self.currencies = set()
+        self.plans = {}          # (from_unit, to_unit) -> (factor, offset, terms)
+
+    @classmethod
+    def load(cls, path):
+        # .csv files are read as CSV, anything else as a SQLite database
+        store = cls()
+        if str(path).lower().endswith(".csv"):
+            store.read_csv(path)
+        else:
+            store.read_sqlite(path)
+        return store
+
+    def add(self, series, timestamp, rate):
+        # Add one point of "CUR/UNIT"; a point at an existing timestamp
+        # replaces the old rate
+        key = _split_series(series)
+        currency, denominator = key
+        if currency in UNIT_DIMENSION:
+            raise ValueError(f"'{currency}' is a unit, not a currency")
+        timestamp = to_timestamp(timestamp)
+        points = self.series.get(key)
+        if points is None:
+            points = self.series[key] = _Series()
+            self.currencies.add(currency)
+            if denominator not in UNIT_DIMENSION:
+                self.currencies.add(denominator)
+            self.plans.clear()
+        index = bisect_right(points.timestamps, timestamp)
+        if index and points.timestamps[index - 1] == timestamp:
+            points.rates[index - 1] = float(rate)
+        else:
+            points.timestamps.insert(index, timestamp)
+            points.rates.insert(index, float(rate))
+
+    def read_csv(self, path):
+        with open(path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                self.add(row["series"], row["timestamp"], row["rate"])
+
+    def read_sqlite(self, path, table="rates"):
+        # The connection's context manager only commits, so close explicitly
+        connection = sqlite3.connect(path)
+        try:
+            rows = connection.execute(f'SELECT series, timestamp, rate FROM "{table}"').fetchall()
+        finally:
+            connection.close()
+        for series, timestamp, rate in rows:
+            self.add(series, timestamp, rate)
+
+    def write_sqlite(self, path, table="rates"):
+        connection = sqlite3.connect(path)
+        try:
+            with connection:
+                connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" '
+                                   "(series TEXT, timestamp REAL, rate REAL, PRIMARY KEY (series, timestamp))")
+                connection.executemany(
+                    f'INSERT OR REPLACE INTO "{table}" VALUES (?, ?, ?)',
+                    ((f"{currency}/{denominator}", timestamp, rate)
+                     for (currency, denominator), points in self.series.items()
+                     for timestamp, rate in zip(points.timestamps, points.rates)))
+        finally:
+            connection.close()
+
+    # As-of lookups
+
+    def rate_at(self, series, at):
+        # Rate of "CUR/UNIT" in force at `at`: the latest point at or before it
+        key = _split_series(series) if isinstance(series, str) else series
+        return self._rate_at(key, to_timestamp(at))
+
+    def _rate_at(self, key, timestamp):
+        points = self.series.get(key)
+        index = bisect_right(points.timestamps, timestamp) - 1 if points else -1
+        if index < 0:
+            raise MissingRateError(f"No '{key[0]}/{key[1]}' rate at or before {timestamp}")
+        return points.rates[index]
+
+    def _rates_at(self, key, timestamps):
+        # Vectorised as-of join of a whole timestamp array against one series
+        import numpy as np
+
+        points = self.series.get(key)
+        if points is None:
+            raise MissingRateError(f"No '{key[0]}/{key[1]}' rates")
+        indices = np.searchsorted(np.asarray(points.timestamps), timestamps, side="right") - 1
+        if indices.size and indices.min() < 0:
+            raise MissingRateError(f"No '{key[0]}/{key[1]}' rate at or before {timestamps.min()}")
+        return np.asarray(points.rates)[indices]
+
+    # Conversion plans: a static (factor, offset) from the unit registry plus
+    # the rate series to multiply (+1) or divide (-1) by at conversion time
+
+    def _kind(self, unit):
+        # ("quantity", unit), ("money", currency) or ("price", (currency, unit))
+        if unit in UNIT_DIMENSION:
+            return "quantity", unit
+        if unit in self.currencies:
+            return "money", unit
+        currency, slash, denominator = str(unit).partition("/")
+        if slash and currency in self.currencies and denominator in UNIT_DIMENSION:
+            return "price", (currency, denominator)
+        raise UnknownUnitError(unit, "Currency")
+
+    def _quote(self, from_currency, to_currency):
+        # Terms for one directly quoted exchange rate, or None
+        if (to_currency, from_currency) in self.series:
+            return [((to_currency, from_currency), 1)]
+        if (from_currency, to_currency) in self.series:
+            return [((from_currency, to_currency), -1)]
+        return None
+
+    def _exchange(self, from_currency, to_currency):
+        # Terms for the price of one from_currency in to_currency: a direct
+        # quote, or else a cross rate through one common currency (GBP ->
+        # USD -> EUR), both legs taken at the same time
+        if from_currency == to_currency:
+            return []
+        terms = self._quote(from_currency, to_currency)
+        if terms is not None:
+            return terms
+        for common in sorted(self.currencies - {from_currency, to_currency}):
+            first = self._quote(from_currency, common)
+            second = first and self._quote(common, to_currency)
+            if second:
+                return first + second
+        raise MissingRateError(f"No exchange rate between '{from_currency}' and '{to_currency}'")
+
+    def _price(self, currency, unit):
+        # (static factor, terms) for the price of one `unit` in `currency`,
+        # preferring a series quoted in that currency
+        dimension = UNIT_DIMENSION[unit]
+        candidates = sorted((key for key in self.series if UNIT_DIMENSION.get(key[1]) == dimension),
+                            key=lambda key: key[0] != currency)
+        for series_currency, denominator in candidates:
+            try:
+                exchange = self._exchange(series_currency, currency)
+            except MissingRateError:
+                continue
+            factor, offset = get_factor(unit, denominator)
+            if offset:
+                raise IncompatibleUnitsError(unit, currency)
+            return factor, [((series_currency, denominator), 1)] + exchange
+        raise MissingRateError(f"No rate for pricing '{unit}' in '{currency}'")
+
+    def _plan(self, from_unit, to_unit):
+        plan = self.plans.get((from_unit, to_unit))
+        if plan is not None:
+            return plan
+        (from_kind, source), (to_kind, target) = self._kind(from_unit), self._kind(to_unit)
+        if from_kind == to_kind == "quantity":
+            plan = (*get_factor(from_unit, to_unit), [])
+        elif from_kind == to_kind == "money":
+            plan = (1.0, 0.0, self._exchange(source, target))
+        elif from_kind == "quantity" and to_kind == "money":
+            factor, terms = self._price(target, source)
+            plan = (factor, 0.0, terms)
+        elif from_kind == "money" and to_kind == "quantity":
+            factor, terms = self._price(source, target)
+            plan = (1 / factor, 0.0, [(key, -power) for key, power in terms])
+        elif from_kind == to_kind == "price":
+            (from_currency, from_per), (to_currency, to_per) = source, target
+            try:
+                factor, offset = get_factor(to_per, from_per)
+            except IncompatibleUnitsError:
+                raise IncompatibleUnitsError(from_unit, to_unit) from None
+            if offset:
+                raise IncompatibleUnitsError(from_unit, to_unit)
+            plan = (factor, 0.0, self._exchange(from_currency, to_currency))
+        else:
+            raise IncompatibleUnitsError(from_unit, to_unit)
+        self.plans[(from_unit, to_unit)] = plan
+        return plan
+
+    # Conversions
+
+    def get_factor(self, from_unit, to_unit, at):
+        # (factor, offset) in force at `at`, like units.get_factor
+        factor, offset, terms = self._plan(from_unit, to_unit)
+        timestamp = to_timestamp(at)
+        for key, power in terms:
+            rate = self._rate_at(key, timestamp)
+            factor = factor * rate if power > 0 else factor / rate
+        return factor, offset
+
+    def convert(self, value, from_unit, to_unit, at):
+        factor, offset = self.get_factor(from_unit, to_unit, at)
+        return value * factor + offset
+
+    def convert_array(self, values, timestamps, from_unit, to_unit, out=None):
+        # Per-element timestamps (epoch seconds, datetime64 or ISO strings).
+        # Each rate series involved is joined against the whole timestamp
+        # array once with np.searchsorted, not looked up row by row.
+        import numpy as np
+
+        factor, offset, terms = self._plan(from_unit, to_unit)
+        values = np.asarray(values)
+        if not np.issubdtype(values.dtype, np.inexact):
+            values = values.astype(np.float64)
+        timestamps = _timestamps_array(timestamps)
+        result = np.multiply(values, factor, out=out)
+        for key, power in terms:
+            rates = self._rates_at(key, timestamps)
+            # In place for arrays; 0-d input stays a NumPy scalar
+            if power > 0:
+                result *= rates
+            else:
+                result /= rates
+        if offset:
+            result += offset
+        return result
@@ -0,0 +1,285 @@
+# Asyncio HTTP service exposing the unit registry to other services, without
+# Streamlit and without third-party web frameworks.
+#
+#   python service.py --port 8000
+#
+#   GET  /units                                    -> {"Length": ["Meter", ...], ...}
+#   GET  /convert?value=10&from=PSI&to=Pascal      -> {"value": 68947.6, "unit": "Pascal"}
+#   POST /convert        {"value": 10, "from": "PSI", "to": "Pascal"}
+#   POST /convert/batch  {"from": "PSI", "to": "Pascal", "values": [1, 2, ...]}
+#                        or {"conversions": [{"value": 1, "from": "PSI", "to": "Pascal"}, ...]}
+#
+# Single conversions arriving close together are coalesced: they are queued
+# for up to --batch-window milliseconds, grouped by unit pair and converted
+# with one convert_array call per pair.
+import argparse
+import asyncio
+import json
+import math
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlsplit
+
+from units import DIMENSIONS, ConversionError, convert_array, get_factor
+
+MAX_BODY = 64 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _check_units(from_unit, to_unit):
+    try:
+        get_factor(from_unit, to_unit)
+    except (ConversionError, TypeError):
+        raise BadRequest(f"Cannot convert '{from_unit}' to '{to_unit}'") from None
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise BadRequest(f"Expected a number, got {value!r}")
+    try:
+        value = float(value)
+    except OverflowError:
+        raise BadRequest("Number out of range") from None
+    if not math.isfinite(value):
+        raise BadRequest("Number out of range")
+    return value
+
+
+def _finite(result):
+    # JSON has no Infinity/NaN, so a result that overflows is an error
+    if not math.isfinite(result):
+        raise BadRequest("Result out of range")
+    return result
+
+
+class Coalescer:
+    # Collects single conversions for a short window and flushes them as one
+    # vectorised convert_array call per unit pair.
+
+    def __init__(self, window=0.002, max_batch=4096):
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []
+        self.flush_handle = None
+
+    def submit(self, value, from_unit, to_unit):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((value, from_unit, to_unit, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        pending, self.pending = self.pending, []
+
+        groups = defaultdict(list)
+        for value, from_unit, to_unit, future in pending:
+            groups[(from_unit, to_unit)].append((value, future))
+        for (from_unit, to_unit), items in groups.items():
+            try:
+                results = convert_array([value for value, _ in items], from_unit, to_unit).tolist()
+            except Exception:
+                # Convert the group one by one so a bad value only fails
+                # its own request
+                for value, future in items:
+                    self._resolve_one(future, value, from_unit, to_unit)
+                continue
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _resolve_one(future, value, from_unit, to_unit):
+        if future.done():
+            return
+        try:
+            result = convert_array([value], from_unit, to_unit).tolist()[0]
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+
+class ConversionService:
+
+    def __init__(self, coalescer):
+        self.coalescer = coalescer
+
+    async def handle(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/units":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            return 200, {dimension: list(units) for dimension, units in DIMENSIONS.items()}
+        if url.path == "/convert":
+            if method == "GET":
+                query = dict(parse_qsl(url.query))
+                try:
+                    payload = {"value": float(query.get("value", "")),
+                               "from": query.get("from"), "to": query.get("to")}
+                except ValueError:
+                    raise BadRequest("'value' must be a number") from None
+            elif method == "POST":
+                payload = self._json(body)
+            else:
+                return 405, {"error": "Use GET or POST"}
+            return 200, await self.convert_one(payload)
+        if url.path == "/convert/batch":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+            return 200, self.convert_batch(self._json(body))
+        return 404, {"error": f"No route for {url.path}"}
+
+    def _json(self, body):
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            raise BadRequest("Body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise BadRequest("Body must be a JSON object")
+        return payload
+
+    async def convert_one(self, payload):
+        value = _number(payload.get("value"))
+        from_unit, to_unit = payload.get("from"), payload.get("to")
+        _check_units(from_unit, to_unit)
+        result = await self.coalescer.submit(value, from_unit, to_unit)
+        return {"value": _finite(result), "unit": to_unit}
+
+    def convert_batch(self, payload):
+        if "values" in payload:
+            # One unit pair for the whole batch: a single vectorised call
+            from_unit, to_unit = payload.get("from"), payload.get("to")
+            _check_units(from_unit, to_unit)
+            values = payload["values"]
+            if not isinstance(values, list):
+                raise BadRequest("'values' must be a list")
+            values = [_number(value) for value in values]
+            results = convert_array(values, from_unit, to_unit).tolist()
+            return {"values": [_finite(result) for result in results], "unit": to_unit}
+
+        conversions = payload.get("conversions")
+        if not isinstance(conversions, list):
+            raise BadRequest("Expected 'values' or 'conversions'")
+        groups = defaultdict(list)
+        for position, item in enumerate(conversions):
+            if not isinstance(item, dict):
+                raise BadRequest("Each conversion must be an object")
+            from_unit, to_unit = item.get("from"), item.get("to")
+            _check_units(from_unit, to_unit)
+            groups[(from_unit, to_unit)].append((position, _number(item.get("value"))))
+        results = [None] * len(conversions)
+        for (from_unit, to_unit), items in groups.items():
+            converted = convert_array([value for _, value in items], from_unit, to_unit)
+            for (position, _), result in zip(items, converted.tolist()):
+                results[position] = {"value": _finite(result), "unit": to_unit}
+        return {"results": results}
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("Malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("Invalid Content-Length") from None
+    if length > MAX_BODY:
+        return method, target, version, headers, None
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload, allow_nan=False).encode()
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+def make_handler(service):
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, target, version, headers, body = request
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = (connection == "keep-alive" if version == "HTTP/1.0"
+                                  else connection != "close")
+                    if body is None:
+                        status, payload = 413, {"error": "Body too large"}
+                        keep_alive = False
+                    else:
+                        status, payload = await service.handle(method, target, body)
+                except BadRequest as exc:
+                    status, payload = 400, {"error": str(exc)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    status, payload = 500, {"error": "Internal server error"}
+                    keep_alive = False
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(host="127.0.0.1", port=8000, batch_window_ms=2.0, max_batch=4096):
+    service = ConversionService(Coalescer(batch_window_ms / 1000, max_batch))
+    server = await asyncio.start_server(make_handler(service), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve unit conversions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-window", type=float, default=2.0,
+                        help="milliseconds to coalesce single conversions (default 2)")
+    parser.add_argument("--max-batch", type=int, default=4096,
+                        help="flush a coalesced batch early at this size (default 4096)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
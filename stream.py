@@ -0,0 +1,378 @@
+# Long-running live conversion of reading streams, for monitoring agents.
+# Readings come from stdin or from connections to a local TCP/Unix socket
+# (one stream per connection, answered on the same connection), and every
+# stream runs as its own asyncio task so one process serves many of them.
+#
+#   python stream.py --to Pascal --to Celsius                  # stdin -> stdout
+#   python stream.py --tcp 127.0.0.1:9000 --to Pascal
+#   python stream.py --unix /tmp/convert.sock --binary
+#
+# Text records are lines "VALUE UNIT" or "VALUE FROM -> TO"; the reply is
+# "RESULT UNIT" or "error: MESSAGE", one line per record, in order. Without
+# "-> TO" the --to unit of the reading's dimension is used.
+#
+# Binary records (--binary) are a 4-byte big-endian length followed by a
+# big-endian float64 value and the UTF-8 unit spec ("PSI" or "PSI->Pascal").
+# Replies are a 4-byte length, a status byte (0 ok, 1 error) and then either
+# a float64 and the UTF-8 unit, or the UTF-8 error message.
+#
+# Records are micro-batched: once one arrives, the stream waits up to
+# --latency-ms for more, converts the batch with one factor lookup per unit
+# pair and writes all replies at once. A bounded queue between parsing and
+# converting provides backpressure: when it is full the stream stops reading,
+# and a slow consumer blocks the stream at writer.drain().
+import argparse
+import asyncio
+import struct
+import sys
+import time
+
+from units import UNIT_DIMENSION, ConversionError, UnknownUnitError, get_factor, get_recorder
+
+MAX_RECORD = 4096        # bytes per binary record
+MAX_LINE = 64 * 1024     # bytes per text line
+_LENGTH = struct.Struct(">I")
+_VALUE = struct.Struct(">d")
+_EOF = object()
+
+
+class StreamError(Exception):
+    pass
+
+
+def parse_unit_spec(spec, targets):
+    # "FROM" or "FROM -> TO"; targets maps dimension -> default target unit
+    from_unit, arrow, to_unit = spec.partition("->")
+    from_unit = from_unit.strip()
+    if arrow:
+        return from_unit, to_unit.strip()
+    dimension = UNIT_DIMENSION.get(from_unit)
+    if dimension is None:
+        raise UnknownUnitError(from_unit)
+    if dimension not in targets:
+        raise ConversionError(f"No target unit for '{from_unit}'")
+    return from_unit, targets[dimension]
+
+
+def parse_line(line, targets):
+    value, _, spec = line.strip().partition(" ")
+    try:
+        value = float(value)
+    except ValueError:
+        raise ConversionError(f"Invalid value '{value}'") from None
+    return (value, *parse_unit_spec(spec, targets))
+
+
+async def read_text_records(reader, targets):
+    # A line longer than MAX_LINE gets one error reply; the rest of it, up to
+    # the next newline, is discarded and reading carries on
+    skipping = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.LimitOverrunError as exc:
+            # The buffered part of the line is dropped, never held whole
+            await reader.readexactly(exc.consumed)
+            if not skipping:
+                skipping = True
+                yield ConversionError(f"Line longer than {MAX_LINE} bytes")
+            continue
+        except asyncio.IncompleteReadError as exc:
+            # EOF; a last line without a newline is still converted
+            line = exc.partial
+            if not line or skipping:
+                return
+        if skipping:
+            skipping = False  # the tail of the over-long line
+            continue
+        line = line.decode("utf-8", "replace")
+        if not line.strip():
+            continue
+        try:
+            yield parse_line(line, targets)
+        except ConversionError as exc:
+            yield exc
+
+
+async def read_binary_records(reader, targets):
+    while True:
+        try:
+            header = await reader.readexactly(_LENGTH.size)
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial:
+                raise StreamError("Truncated record length") from None
+            return
+        (length,) = _LENGTH.unpack(header)
+        if not _VALUE.size <= length <= MAX_RECORD:
+            raise StreamError(f"Record length {length} out of range")
+        try:
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise StreamError("Truncated record") from None
+        (value,) = _VALUE.unpack_from(payload)
+        try:
+            yield (value, *parse_unit_spec(payload[_VALUE.size:].decode("utf-8"), targets))
+        except (ConversionError, UnicodeDecodeError) as exc:
+            yield ConversionError(str(exc))
+
+
+def encode_text(result, unit, error):
+    if error is not None:
+        return f"error: {error}\n".encode()
+    return f"{result!r} {unit}\n".encode()
+
+
+def encode_binary(result, unit, error):
+    if error is not None:
+        body = b"\x01" + str(error).encode()
+    else:
+        body = b"\x00" + _VALUE.pack(result) + unit.encode()
+    return _LENGTH.pack(len(body)) + body
+
+
+def convert_batch(batch):
+    # (result, unit, error) per record; factors are looked up once per unit
+    # pair per batch. With instrumentation enabled, each pair is recorded as
+    # one batch with its share of the batch's latency.
+    recorder = get_recorder()
+    started = time.perf_counter() if recorder is not None else 0.0
+    factors = {}
+    counts = {}
+    replies = []
+    for record in batch:
+        if isinstance(record, Exception):
+            replies.append((None, None, record))
+            continue
+        value, from_unit, to_unit = record
+        pair = (from_unit, to_unit)
+        factor = factors.get(pair)
+        if factor is None:
+            try:
+                factor = factors[pair] = get_factor(from_unit, to_unit)
+            except ConversionError as exc:
+                factor = factors[pair] = exc
+        counts[pair] = counts.get(pair, 0) + 1
+        if isinstance(factor, Exception):
+            replies.append((None, None, factor))
+        else:
+            replies.append((value * factor[0] + factor[1], to_unit, None))
+
+    if recorder is not None and counts:
+        seconds = (time.perf_counter() - started) / sum(counts.values())
+        for (from_unit, to_unit), count in counts.items():
+            recorder.record(UNIT_DIMENSION.get(from_unit, "unknown"), from_unit, to_unit,
+                            seconds * count, error=isinstance(factors[(from_unit, to_unit)], Exception),
+                            calls=count)
+    return replies
+
+
+class StreamConverter:
+
+    def __init__(self, targets=None, latency=0.005, max_batch=4096, queue_size=16384, binary=False):
+        self.targets = dict(targets or {})
+        self.latency = latency
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.binary = binary
+
+    async def run(self, reader, writer):
+        # Convert one stream until EOF; returns the number of records
+        queue = asyncio.Queue(self.queue_size)
+        producer = asyncio.create_task(self._produce(reader, queue))
+        try:
+            count = await self._consume(queue, writer)
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        return count
+
+    async def _produce(self, reader, queue):
+        read_records = read_binary_records if self.binary else read_text_records
+        try:
+            async for record in read_records(reader, self.targets):
+                await queue.put(record)  # blocks while the queue is full
+        except ConnectionError:
+            pass
+        except StreamError as exc:
+            await queue.put(exc)
+        except Exception as exc:
+            # Anything else still ends the stream with an error reply, so the
+            # consumer is never left waiting for _EOF
+            await queue.put(StreamError(f"{type(exc).__name__}: {exc}"))
+        await queue.put(_EOF)
+
+    async def _consume(self, queue, writer):
+        encode = encode_binary if self.binary else encode_text
+        count = 0
+        done = False
+        while not done:
+            first = await queue.get()
+            if first is _EOF:
+                break
+            if self.latency and queue.qsize() < self.max_batch - 1:
+                # Let the batch fill for at most the latency budget
+                await asyncio.sleep(self.latency)
+            batch = [first]
+            while len(batch) < self.max_batch and not queue.empty():
+                record = queue.get_nowait()
+                if record is _EOF:
+                    done = True
+                    break
+                batch.append(record)
+
+            writer.write(b"".join(encode(*reply) for reply in convert_batch(batch)))
+            await writer.drain()
+            count += len(batch)
+        return count
+
+
+class _StdinReader:
+    # Minimal StreamReader over blocking stdin: each refill is one read in the
+    # default executor, made only when the parser needs more bytes, so a fast
+    # producer is held back by the pipe itself. Works for pipes, terminals and
+    # redirected files alike.
+
+    def __init__(self, handle, chunk_size=65536, limit=MAX_LINE):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.limit = limit
+        self.buffer = bytearray()
+        self.eof = False
+
+    async def _fill(self):
+        chunk = await asyncio.get_running_loop().run_in_executor(
+            None, self.handle.read1, self.chunk_size)
+        if chunk:
+            self.buffer += chunk
+        else:
+            self.eof = True
+
+    async def readuntil(self, separator=b"\n"):
+        # Same contract as StreamReader.readuntil: LimitOverrunError leaves
+        # the buffer untouched, IncompleteReadError carries what is left at EOF
+        while True:
+            end = self.buffer.find(separator)
+            if end > self.limit:
+                raise asyncio.LimitOverrunError("Separator is found, but chunk is longer than limit", end)
+            if end >= 0:
+                end += len(separator)
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end]
+                return line
+            if len(self.buffer) > self.limit:
+                raise asyncio.LimitOverrunError("Separator is not found, and chunk exceed the limit",
+                                                len(self.buffer))
+            if self.eof:
+                partial = bytes(self.buffer)
+                self.buffer.clear()
+                raise asyncio.IncompleteReadError(partial, None)
+            await self._fill()
+
+    async def readexactly(self, size):
+        while len(self.buffer) < size and not self.eof:
+            await self._fill()
+        if len(self.buffer) < size:
+            partial = bytes(self.buffer)
+            self.buffer.clear()
+            raise asyncio.IncompleteReadError(partial, size)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class _StdoutWriter:
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def write(self, data):
+        self.handle.write(data)
+
+    async def drain(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.handle.flush)
+
+    def close(self):
+        self.handle.flush()
+
+
+def make_handler(converter):
+
+    async def handle_connection(reader, writer):
+        try:
+            await converter.run(reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve_stdio(converter):
+    writer = _StdoutWriter(sys.stdout.buffer)
+    try:
+        return await converter.run(_StdinReader(sys.stdin.buffer), writer)
+    finally:
+        writer.close()
+
+
+async def serve_socket(converter, tcp=None, unix=None):
+    if unix:
+        server = await asyncio.start_unix_server(make_handler(converter), unix, limit=MAX_LINE)
+    else:
+        host, _, port = tcp.rpartition(":")
+        server = await asyncio.start_server(make_handler(converter), host or "127.0.0.1", int(port),
+                                            limit=MAX_LINE)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_targets(units):
+    # --to units -> {dimension: unit}, one default target per dimension
+    targets = {}
+    for unit in units:
+        dimension = UNIT_DIMENSION.get(unit)
+        if dimension is None:
+            raise ValueError(f"Unknown unit '{unit}'")
+        if dimension in targets:
+            raise ValueError(f"Two --to units for {dimension}: '{targets[dimension]}' and '{unit}'")
+        targets[dimension] = unit
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a live stream of readings.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--tcp", metavar="HOST:PORT", help="listen on a TCP socket instead of stdin")
+    source.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of stdin")
+    parser.add_argument("--to", action="append", default=[], metavar="UNIT",
+                        help="default target unit for its dimension (repeatable)")
+    parser.add_argument("--binary", action="store_true", help="length-prefixed binary records")
+    parser.add_argument("--latency-ms", type=float, default=5.0,
+                        help="longest a record waits for its batch to fill (default 5)")
+    parser.add_argument("--max-batch", type=int, default=4096,
+                        help="records per batch at most (default 4096)")
+    parser.add_argument("--queue-size", type=int, default=16384,
+                        help="parsed records buffered per stream before reading pauses (default 16384)")
+    args = parser.parse_args(argv)
+    try:
+        targets = parse_targets(args.to)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    converter = StreamConverter(targets, args.latency_ms / 1000, args.max_batch,
+                                args.queue_size, args.binary)
+    try:
+        if args.tcp or args.unix:
+            asyncio.run(serve_socket(converter, args.tcp, args.unix))
+        else:
+            asyncio.run(serve_stdio(converter))
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+# Core conversion registry. Only the standard library is imported here;
+# NumPy and the conversion graph are loaded on first use, so importing this
+# module (or converters.py) stays cheap for batch workers and serverless cold
+# starts.
+from numbers import Integral
+from types import MappingProxyType
+
+
+class ConversionError(Exception):
+    pass
+
+
+# Both lookup errors are also KeyErrors, which is what unknown units raised
+# before there were typed errors, so existing `except KeyError` keeps working.
+class UnknownUnitError(ConversionError, KeyError):
+
+    def __init__(self, unit, dimension=None):
+        super().__init__(unit)
+        self.unit = unit
+        self.dimension = dimension
+
+    def __str__(self):
+        if self.dimension:
+            return f"Invalid {self.dimension.lower()} unit '{self.unit}'"
+        return f"Unknown unit '{self.unit}'"
+
+
+class IncompatibleUnitsError(ConversionError, KeyError):
+
+    def __init__(self, from_unit, to_unit):
+        super().__init__(from_unit, to_unit)
+        self.from_unit = from_unit
+        self.to_unit = to_unit
+
+    def __str__(self):
+        return f"Cannot convert '{self.from_unit}' to '{self.to_unit}'"
+
+
+# Unit tables: how many base units one unit is worth (the first unit of each
+# dimension is its base). Affine units such as temperatures are written as
+# (scale, offset) so that value_in_base = value * scale + offset. Values that
+# no float can hold exactly are written as "numerator/denominator" strings.
+_UNIT_TABLES = {
+    "Length": {
+        "Meter": 1,
+        "Kilometer": 1000,
+        "Centimeter": 0.01,
+    },
+    "Weight": {
+        "Kilogram": 1,
+        "Gram": 0.001,
+        "Pound": 1 / 2.20462,
+    },
+    "Temperature": {
+        "Kelvin": 1,
+        "Celsius": (1, 273.15),
+        "Fahrenheit": ("5/9", "45967/180"),  # 0 °F = 459.67 °R = 459.67 * 5/9 K
+    },
+    "Volume": {
+        "Liter": 1,
+        "Milliliter": 1e-3,
+        "Cubic Meter": 1e3,
+        "Cubic Centimeter": 1e-3,  # 1 cm³ = 1 mL
+        "Cubic Inch": 1 / 61.0237,
+        "Cubic Foot": 1 / 0.0353147,
+        "Gallon (US)": 1 / 0.264172,
+    },
+    "Speed": {
+        "Meters per Second (m/s)": 1,
+        "Kilometers per Hour (km/h)": 1 / 3.6,
+        "Miles per Hour (mph)": 1 / 2.237,
+        "Feet per Second (ft/s)": 1 / 3.281,
+        "Knots": 1 / 1.944,
+    },
+    "Time": {
+        "Second": 1,
+        "Minute": 60,
+        "Hour": 3600,
+        "Day": 86400,
+        "Week": 604800,
+    },
+    "Area": {
+        "Square Meter": 1,
+        "Square Kilometer": 1e6,
+        "Square Centimeter": 1e-4,
+        "Square Foot": 0.092903,
+        "Square Inch": 0.00064516,
+        "Acre": 4046.86,
+        "Hectare": 10000,
+    },
+    "Pressure": {
+        "Pascal": 1,
+        "Bar": 100000,
+        "PSI": 6894.76,
+        "Atmosphere": 101325,
+        "Torr": 133.322,
+    },
+    "Energy": {
+        "Joule": 1,
+        "Kilojoule": 1000,
+        "Calorie": 4.184,
+        "Kilocalorie": 4184,
+        "Watt-hour": 3600,
+        "Kilowatt-hour": 3.6e6,
+        "Electronvolt": 1.60218e-19,
+    },
+    "Power": {
+        "Watt": 1,
+        "Kilowatt": 1000,
+        "Horsepower": 745.7,
+        "Megawatt": 1e6,
+        "Gigawatt": 1e9,
+        "BTU/hour": 0.293071,
+        "Foot-pound/minute": 0.022597,
+    },
+    "Storage": {
+        "Byte": 1,
+        "Kilobyte": 1024,
+        "Megabyte": 1024**2,
+        "Gigabyte": 1024**3,
+        "Terabyte": 1024**4,
+        "Petabyte": 1024**5,
+    },
+    "Frequency": {
+        "Hertz": 1,
+        "Kilohertz": 1e3,
+        "Megahertz": 1e6,
+        "Gigahertz": 1e9,
+    },
+    "Angle": {
+        "Degree": 1,
+        "Radian": 57.2958,  # 1 radian ≈ 57.2958 degrees
+        "Gradian": 0.9,     # 1 gradian = 0.9 degrees
+    },
+}
+
+
+def _to_base(entry):
+    # Normalise a table entry to a (scale, offset) pair
+    if isinstance(entry, tuple):
+        return entry
+    return (entry, 0.0)
+
+
+def _ratio(number):
+    # Exact (numerator, denominator) of a table value. Floats are taken as
+    # written (273.15 is 27315/100). Only int arithmetic is used, so building
+    # the registry does not import fractions (and with it decimal and re).
+    if isinstance(number, int):
+        return number, 1
+    if isinstance(number, str):
+        numerator, _, denominator = number.partition("/")
+        return int(numerator), int(denominator or 1)
+    mantissa, _, exponent = repr(number).partition("e")
+    whole, _, digits = mantissa.partition(".")
+    exponent = int(exponent or 0) - len(digits)
+    if exponent >= 0:
+        return int(whole + digits) * 10**exponent, 1
+    return int(whole + digits), 10**-exponent
+
+
+def _build_registry():
+    dimensions = {}
+    unit_dimension = {}
+    pairs = {}
+
+    for dimension, table in _UNIT_TABLES.items():
+        units = tuple(table)
+        dimensions[dimension] = units
+        exact = {unit: tuple(map(_ratio, _to_base(table[unit]))) for unit in units}
+        dimension_pairs = {}
+        for from_unit in units:
+            unit_dimension[from_unit] = dimension
+            (from_n, from_d), (from_on, from_od) = exact[from_unit]
+            for to_unit in units:
+                (to_n, to_d), (to_on, to_od) = exact[to_unit]
+                # from -> base -> to, folded into one multiply-add. Both are
+                # exact rationals; int / int rounds to float only once.
+                factor = (from_n * to_d) / (from_d * to_n)
+                offset = ((from_on * to_od - to_on * from_od) * to_d) / (from_od * to_od * to_n)
+                dimension_pairs[(from_unit, to_unit)] = (factor, offset)
+        pairs[dimension] = MappingProxyType(dimension_pairs)
+
+    return (
+        MappingProxyType(dimensions),
+        MappingProxyType(unit_dimension),
+        MappingProxyType(pairs),
+    )
+
+
+# Built once at import time and read-only afterwards:
+#   DIMENSIONS     dimension -> tuple of unit names (base unit first)
+#   UNIT_DIMENSION unit name -> dimension
+#   PAIRS          dimension -> {(from_unit, to_unit): (factor, offset)}
+DIMENSIONS, UNIT_DIMENSION, PAIRS = _build_registry()
+
+
+def _build_ids():
+    names = tuple(unit for units in DIMENSIONS.values() for unit in units)
+    ids = {unit: index for index, unit in enumerate(names)}
+    count = len(names)
+    # Flat count x count table; cross-dimension slots stay None
+    pairs = [None] * (count * count)
+    for dimension_pairs in PAIRS.values():
+        for (from_unit, to_unit), pair in dimension_pairs.items():
+            pairs[ids[from_unit] * count + ids[to_unit]] = pair
+    return names, MappingProxyType(ids), tuple(pairs)
+
+
+# Integer unit ids let hot loops and batch APIs skip string hashing:
+#   UNIT_NAMES  unit id -> unit name
+#   UNIT_IDS    unit name -> unit id
+UNIT_NAMES, UNIT_IDS, _ID_PAIRS = _build_ids()
+_UNIT_COUNT = len(UNIT_NAMES)
+
+
+def _build_graph():
+    from graph import ConversionGraph
+
+    graph = ConversionGraph()
+    for table in _UNIT_TABLES.values():
+        base = next(iter(table))
+        for unit, entry in table.items():
+            if unit != base:
+                graph.add_edge(unit, base, *(n / d for n, d in map(_ratio, _to_base(entry))))
+    return graph
+
+
+# Units registered at runtime are only known to the graph; pairs involving
+# them are resolved by path search on first use and cached there. The graph
+# itself is built the first time it is needed.
+_GRAPH = None
+
+
+def get_graph():
+    global _GRAPH
+    if _GRAPH is None:
+        _GRAPH = _build_graph()
+    return _GRAPH
+
+
+def register_unit(unit, reference_unit, factor, offset=0.0):
+    # Declare 1 unit == factor reference_unit (+ offset for affine units).
+    # reference_unit may itself be a registered unit, so chains such as
+    # Mile -> Foot -> Meter work.
+    if unit in UNIT_DIMENSION:
+        raise ValueError(f"'{unit}' is a built-in unit")
+    graph = get_graph()
+    if reference_unit not in graph:
+        raise UnknownUnitError(reference_unit)
+    graph.add_edge(unit, reference_unit, factor, offset)
+
+
+def unit_id(unit):
+    # Resolve a unit name to its integer id once, outside the hot loop
+    try:
+        return UNIT_IDS[unit]
+    except KeyError:
+        raise UnknownUnitError(unit) from None
+
+
+def invalid_pair(dimension, from_unit, to_unit):
+    # The typed error for a pair that a dimension's converter cannot handle
+    for unit in (from_unit, to_unit):
+        if UNIT_DIMENSION.get(unit) is None:
+            return UnknownUnitError(unit, dimension)
+    return IncompatibleUnitsError(from_unit, to_unit)
+
+
+def _pair_error(from_unit, to_unit):
+    graph = get_graph()
+    for unit in (from_unit, to_unit):
+        if unit not in UNIT_DIMENSION and unit not in graph:
+            return UnknownUnitError(unit)
+    return IncompatibleUnitsError(from_unit, to_unit)
+
+
+def get_factor_by_id(from_id, to_id):
+    if not 0 <= from_id < _UNIT_COUNT:
+        raise UnknownUnitError(from_id)
+    if not 0 <= to_id < _UNIT_COUNT:
+        raise UnknownUnitError(to_id)
+    pair = _ID_PAIRS[from_id * _UNIT_COUNT + to_id]
+    if pair is None:
+        raise IncompatibleUnitsError(UNIT_NAMES[from_id], UNIT_NAMES[to_id])
+    return pair
+
+
+def get_factor(from_unit, to_unit):
+    # Direct (factor, offset) for a pair of unit names or unit ids. Raises
+    # UnknownUnitError or IncompatibleUnitsError.
+    if type(from_unit) is int and type(to_unit) is int:
+        if 0 <= from_unit < _UNIT_COUNT and 0 <= to_unit < _UNIT_COUNT:
+            pair = _ID_PAIRS[from_unit * _UNIT_COUNT + to_unit]
+            if pair is not None:
+                return pair
+        return get_factor_by_id(from_unit, to_unit)  # raises the typed error
+    try:
+        return PAIRS[UNIT_DIMENSION[from_unit]][(from_unit, to_unit)]
+    except KeyError:
+        pass
+    if isinstance(from_unit, Integral) and isinstance(to_unit, Integral):
+        # NumPy integer ids, e.g. taken from an id array
+        return get_factor_by_id(int(from_unit), int(to_unit))
+    try:
+        return get_graph().resolve(from_unit, to_unit)
+    except KeyError:
+        raise _pair_error(from_unit, to_unit) from None
+
+
+# Opt-in instrumentation: instrumentation.enable() sets a Recorder here.
+# While none is set, convert() and convert_array() pay one global check.
+_RECORDER = None
+
+
+def set_recorder(recorder):
+    global _RECORDER
+    _RECORDER = recorder
+
+
+def get_recorder():
+    return _RECORDER
+
+
+def _convert(value, from_unit, to_unit):
+    factor, offset = get_factor(from_unit, to_unit)
+    return value * factor + offset
+
+
+def convert(value, from_unit, to_unit):
+    if _RECORDER is not None:
+        return _RECORDER.call(_convert, value, from_unit, to_unit)
+    factor, offset = get_factor(from_unit, to_unit)
+    return value * factor + offset
+
+
+def convert_array(values, from_unit, to_unit, out=None):
+    # Vectorised conversion of a whole array with the precomputed factor.
+    # Integer input is promoted to float64; float32/float64 keep their dtype.
+    # Pass out= (which may be values itself) to convert in place.
+    if _RECORDER is not None:
+        return _RECORDER.call(_convert_array, values, from_unit, to_unit, out)
+    return _convert_array(values, from_unit, to_unit, out)
+
+
+def _convert_array(values, from_unit, to_unit, out=None):
+    import numpy as np
+
+    factor, offset = get_factor(from_unit, to_unit)
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.inexact):
+        values = values.astype(np.float64)
+    result = np.multiply(values, factor, out=out)
+    if offset:
+        # In place for arrays; scalar and 0-d input give a NumPy scalar,
+        # which np.add(..., out=) would reject
+        result += offset
+    return result
+
+
+_FACTOR_MATRIX = None
+
+
+def _factor_matrix():
+    # Flat float64 factor/offset tables indexed by from_id * count + to_id;
+    # NaN marks cross-dimension pairs. Built on first use.
+    global _FACTOR_MATRIX
+    if _FACTOR_MATRIX is None:
+        import numpy as np
+
+        factors = np.full(len(_ID_PAIRS), np.nan)
+        offsets = np.zeros(len(_ID_PAIRS))
+        for index, pair in enumerate(_ID_PAIRS):
+            if pair is not None:
+                factors[index], offsets[index] = pair
+        _FACTOR_MATRIX = (factors, offsets)
+    return _FACTOR_MATRIX
+
+
+def convert_array_by_ids(values, from_ids, to_ids, out=None):
+    # Per-element units: from_ids and to_ids are unit ids (scalars or arrays
+    # broadcastable against values). The factors are gathered in one indexed
+    # read, with no per-element string handling.
+    import numpy as np
+
+    factors, offsets = _factor_matrix()
+    from_ids = np.asarray(from_ids, dtype=np.intp)
+    to_ids = np.asarray(to_ids, dtype=np.intp)
+    for ids in (from_ids, to_ids):
+        if ids.size and (ids.min() < 0 or ids.max() >= _UNIT_COUNT):
+            bad = ids[(ids < 0) | (ids >= _UNIT_COUNT)].flat[0]
+            raise UnknownUnitError(int(bad))
+    index = from_ids * _UNIT_COUNT + to_ids
+    factor = factors[index]
+    bad = np.isnan(factor)
+    if bad.any():
+        position = np.argmax(bad.reshape(-1))
+        bad_from = np.broadcast_to(from_ids, index.shape).reshape(-1)[position]
+        bad_to = np.broadcast_to(to_ids, index.shape).reshape(-1)[position]
+        raise IncompatibleUnitsError(UNIT_NAMES[bad_from], UNIT_NAMES[bad_to])
+
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.inexact):
+        values = values.astype(np.float64)
+    result = np.multiply(values, factor, out=out)
+    result += offsets[index]
+    return result